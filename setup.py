@@ -44,7 +44,6 @@ setup(name='sweetpotatopie',
         "Intended Audience :: Developers",
         "Programming Language :: Python",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 2.6",
         "Programming Language :: Python :: 2.7",
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.2",
@@ -66,5 +65,9 @@ setup(name='sweetpotatopie',
           'testing':testing_extras,
           'docs':docs_extras,
           },
+      entry_points = """\
+      [console_scripts]
+      sweetpotatopie = sweetpotatopie.cli:main
+      """,
       )
 
@@ -4,10 +4,21 @@ PY3 = sys.version_info[0] == 3
 
 if PY3: # pragma: no cover
     text_type = str
+    string_types = (str,)
     from io import StringIO
+    BUILTINS = 'builtins'
+    from sys import intern
 else: # pragma: no cover
     text_type = unicode
+    string_types = (basestring,)
     from StringIO import StringIO
+    BUILTINS = '__builtin__'
+    intern = intern
+
+try:
+    from time import perf_counter
+except ImportError: # pragma: no cover
+    from time import time as perf_counter
 
 def u(x):
     return text_type(x)
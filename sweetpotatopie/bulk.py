@@ -0,0 +1,165 @@
+import collections
+import itertools
+import multiprocessing
+
+import colander
+
+from . import compiled as _compiled
+from ._compat import text_type
+from .limits import ErrorLimiter
+from .parsers import SchemaParser
+
+BulkResult = collections.namedtuple('BulkResult',
+                                    ['index', 'value', 'errors'])
+
+
+class BulkValidator(object):
+    """ Deserialize large numbers of records against a schema, in parallel.
+
+    The schema is passed either as its YAML 'text' (parsed in each worker
+    by 'parser', a :class:`sweetpotatopie.parsers.SchemaParser` by default),
+    or as a 'compiled' artifact (see :mod:`sweetpotatopie.compiled`).  It is
+    sent to each of the 'processes' worker processes (default: one per CPU)
+    once, when the worker starts;  with ``processes=1``, records are
+    deserialized in the calling process.
+
+    Records are sent to the workers in chunks of 'chunk_size', with at most
+    'max_pending' chunks (default: twice the number of workers) in flight
+    at once, so that a slow consumer holds back reading the records.
+
+    If 'max_errors' is passed, each record is deserialized through a
+    :class:`sweetpotatopie.limits.ErrorLimiter`, giving up on the record
+    after that many errors.
+
+    The worker processes are started on first use, and kept until
+    :meth:`close` is called;  validators can be used as context managers.
+    """
+    _pool = None
+
+    def __init__(self, text=None, compiled=None, parser=None, processes=None,
+                 chunk_size=1000, max_pending=None, max_errors=None):
+        if (text is None) == (compiled is None):
+            raise ValueError('pass exactly one of text or compiled')
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if max_pending is None:
+            max_pending = 2 * processes
+        if chunk_size < 1 or processes < 1 or max_pending < 1:
+            raise ValueError(
+                'chunk_size, processes and max_pending must be positive')
+        self.source = (text, compiled, parser, max_errors)
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self._local = None
+
+    def validate(self, records):
+        """ Deserialize each of 'records', yielding a :data:`BulkResult` for
+        each, in the order of 'records'.
+
+        'value' is the deserialized record (None if it is invalid);
+        'errors' is None, or the ``asdict()`` of the :exc:`colander.Invalid`
+        raised for the record.  'records' may be any iterable, and is only
+        read ahead as far as the pending chunks.
+        """
+        chunks = _chunks(records, self.chunk_size)
+        if self.processes == 1:
+            if self._local is None:
+                self._local = _Worker(*self.source)
+            validate = self._local.validate
+            for start, chunk in chunks:
+                for result in _results(start, validate(chunk)):
+                    yield result
+            return
+        if self._pool is None:
+            # Load the schema here first (and drop it), raising any error
+            # in the caller, rather than in each worker.
+            _Worker(*self.source)
+            self._pool = multiprocessing.Pool(self.processes, _init_worker,
+                                              self.source)
+        pending = collections.deque()
+        for start, chunk in chunks:
+            if len(pending) >= self.max_pending:
+                for result in _collect(pending.popleft()):
+                    yield result
+            pending.append((start,
+                            self._pool.apply_async(_validate_chunk, (chunk,))))
+        while pending:
+            for result in _collect(pending.popleft()):
+                yield result
+
+    __call__ = validate
+
+    def close(self):
+        """ Stop the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Worker(object):
+
+    def __init__(self, text, compiled, parser, max_errors):
+        if compiled is not None:
+            schema = _compiled.loads(compiled)
+        else:
+            if parser is None:
+                parser = SchemaParser()
+            schema = parser(text)
+        if max_errors is not None:
+            self.deserialize = ErrorLimiter(schema, max_errors).deserialize
+        else:
+            self.deserialize = schema.deserialize
+
+    def validate(self, chunk):
+        deserialize = self.deserialize
+        results = []
+        for cstruct in chunk:
+            try:
+                results.append((deserialize(cstruct), None))
+            except colander.Invalid as e:
+                errors = dict((key, text_type(value))
+                              for key, value in e.asdict().items())
+                results.append((None, errors))
+        return results
+
+
+_worker = None
+
+
+def _init_worker(text, compiled, parser, max_errors):
+    global _worker
+    _worker = _Worker(text, compiled, parser, max_errors)
+
+
+def _validate_chunk(chunk):
+    return _worker.validate(chunk)
+
+
+def _chunks(records, size):
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _collect(item):
+    start, async_result = item
+    return _results(start, async_result.get())
+
+
+def _results(start, results):
+    return [BulkResult(start + offset, value, errors)
+            for offset, (value, errors) in enumerate(results)]
@@ -0,0 +1,72 @@
+import codecs
+import os
+
+import yaml
+
+
+class Choices(tuple):
+    """ Ordered, immutable sequence of choices with hashed membership tests.
+
+    Instances behave like the tuple of their items (ordering is preserved
+    for error messages and widget ``values``), but ``in`` is answered from
+    a lookup set built once at construction time, rather than by scanning.
+    Unhashable items (and unhashable candidate values) fall back to the
+    linear comparison used by :class:`colander.OneOf`.
+    """
+
+    def __new__(cls, items=()):
+        self = tuple.__new__(cls, items)
+        lookup = set()
+        unhashable = []
+        for item in self:
+            try:
+                lookup.add(item)
+            except TypeError:
+                unhashable.append(item)
+        self._lookup = frozenset(lookup)
+        self._unhashable = tuple(unhashable)
+        return self
+
+    def __contains__(self, value):
+        try:
+            if value in self._lookup:
+                return True
+        except TypeError:
+            return tuple.__contains__(self, value)
+        return value in self._unhashable
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(self),))
+
+
+_loaded = {}
+
+
+def load_choices(path):
+    """ Load a :class:`Choices` instance from the file at ``path``.
+
+    Files ending in ``.yaml``, ``.yml`` or ``.json`` must contain a single
+    YAML sequence;  any other file is read as UTF-8 text, one choice per
+    line, ignoring blank lines.
+
+    Results are cached per process, keyed on the absolute path, so every
+    schema naming the same file shares a single instance;  the cache entry
+    is refreshed if the file's size or modification time changes.
+    """
+    path = os.path.abspath(path)
+    info = os.stat(path)
+    stamp = (info.st_mtime, info.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with codecs.open(path, 'r', 'utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml', '.json'):
+            items = yaml.safe_load(f)
+            if not isinstance(items, list):
+                raise ValueError('%s does not contain a sequence' % path)
+        else:
+            items = [line.strip() for line in f]
+            items = [x for x in items if x]
+    choices = Choices(items)
+    _loaded[path] = (stamp, choices)
+    return choices
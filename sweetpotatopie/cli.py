@@ -0,0 +1,353 @@
+""" The ``sweetpotatopie`` console script.
+
+Subcommands:
+
+``check``
+  Parse schema files, reporting any errors with their line and column.
+
+``compile``
+  Parse the schema files in a directory, writing each schema as a compiled
+  artifact (see :mod:`sweetpotatopie.compiled`).
+
+``bench``
+  Time parsing schema files, and deserializing sample data against them.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+
+import colander
+import yaml
+
+from . import compiled
+from ._compat import perf_counter
+from .parsers import SchemaParser
+from .resolver import NameResolver
+
+SCHEMA_EXTENSIONS = ('.yaml', '.yml')
+ARTIFACT_EXTENSION = '.pickle'
+
+
+def main(argv=None, out=None):
+    """ Run the console script, returning its exit status.
+    """
+    if out is None:
+        out = sys.stdout
+    args = _make_argument_parser().parse_args(argv)
+    options = {
+        'streaming': args.streaming,
+        'safe': args.safe,
+        'allow': args.allow,
+    }
+    results = args.command(args, options)
+    if args.format == 'json':
+        json.dump({'results': results}, out, indent=2, sort_keys=True)
+        out.write('\n')
+    else:
+        args.formatter(results, out)
+    for result in results:
+        if result['status'] == 'error':
+            return 1
+    return 0
+
+
+def _count(minimum):
+    # An argparse type for integers of at least 'minimum'.
+    def _nested(value):
+        try:
+            number = int(value)
+        except ValueError:
+            number = None
+        if number is None or number < minimum:
+            raise argparse.ArgumentTypeError(
+                'must be an integer of at least %d' % minimum)
+        return number
+    return _nested
+
+
+def _make_argument_parser():
+    parser = argparse.ArgumentParser(
+        prog='sweetpotatopie',
+        description='Check, compile and benchmark YAML colander schemas.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-j', '--jobs', type=_count(0), default=1,
+                        help='number of worker processes (0: one per CPU)')
+    common.add_argument('--format', choices=('text', 'json'), default='text',
+                        help='output format')
+    common.add_argument('--streaming', action='store_true',
+                        help='build schemas from the YAML event stream')
+    common.add_argument('--safe', action='store_true',
+                        help='use a safe YAML loader, resolving Python names '
+                             'only within the modules given via --allow')
+    common.add_argument('--allow', action='append', default=[],
+                        metavar='MODULE',
+                        help='module or object which schemas may name '
+                             '(implies --safe;  may be repeated)')
+    subparsers = parser.add_subparsers(dest='subcommand')
+    subparsers.required = True
+
+    check = subparsers.add_parser('check', parents=[common],
+                                  help='check schema files for errors')
+    check.add_argument('paths', nargs='+', metavar='PATH',
+                       help='schema file, or directory of schema files')
+    check.set_defaults(command=_check, formatter=_format_check)
+
+    compile_ = subparsers.add_parser('compile', parents=[common],
+                                     help='compile schema files to artifacts')
+    compile_.add_argument('source', metavar='SOURCE',
+                          help='directory of schema files')
+    compile_.add_argument('-o', '--output', metavar='OUTPUT',
+                          help='directory for the artifacts '
+                               '(default: SOURCE)')
+    compile_.add_argument('--force', action='store_true',
+                          help='recompile up-to-date artifacts (artifacts '
+                               'are only checked against the schema file and '
+                               'the parser options, not against files it '
+                               'refers to, e.g. choices_file)')
+    compile_.set_defaults(command=_compile, formatter=_format_compile)
+
+    bench = subparsers.add_parser('bench', parents=[common],
+                                  help='time parsing and deserialization')
+    bench.add_argument('paths', nargs='+', metavar='PATH',
+                       help='schema file, or directory of schema files')
+    bench.add_argument('--data', metavar='FILE',
+                       help='JSON or YAML file holding a list of sample '
+                            'cstructs to deserialize')
+    bench.add_argument('-n', '--repeat', type=_count(1), default=10,
+                       help='number of repetitions (default: 10)')
+    bench.set_defaults(command=_bench, formatter=_format_bench)
+    return parser
+
+
+def find_schemas(paths):
+    """ Return the schema files named by 'paths', expanding directories.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith(SCHEMA_EXTENSIONS):
+                        found.append(os.path.join(dirpath, filename))
+        else:
+            found.append(path)
+    return found
+
+
+def _check(args, options):
+    tasks = [(path, options) for path in find_schemas(args.paths)]
+    return _map(_check_one, tasks, args.jobs)
+
+
+def _compile(args, options):
+    output = args.output or args.source
+    tasks = []
+    for path in find_schemas([args.source]):
+        relative = os.path.relpath(path, args.source)
+        if relative == os.curdir:  # SOURCE is a single file
+            relative = os.path.basename(path)
+        # Keep the source's extension, so that 'a.yaml' and 'a.yml' do
+        # not share an artifact.
+        target = os.path.join(output, relative + ARTIFACT_EXTENSION)
+        tasks.append((path, target, args.force, options))
+    return _map(_compile_one, tasks, args.jobs)
+
+
+def _bench(args, options):
+    samples = None
+    if args.data:
+        samples = _load_samples(args.data)
+    tasks = [(path, samples, args.repeat, options)
+             for path in find_schemas(args.paths)]
+    return _map(_bench_one, tasks, args.jobs)
+
+
+def _map(func, tasks, jobs):
+    if jobs == 0:
+        jobs = multiprocessing.cpu_count()
+    if jobs == 1 or len(tasks) < 2:
+        return [func(task) for task in tasks]
+    pool = multiprocessing.Pool(min(jobs, len(tasks)))
+    try:
+        return pool.map(func, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _make_parser(options):
+    kw = {'streaming': options['streaming']}
+    if options['safe'] or options['allow']:
+        kw['loader_class'] = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        kw['resolver'] = NameResolver(options['allow'])
+    return SchemaParser(**kw)
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _named(text, path):
+    # A stream named after 'path', so that the schema's marks carry it
+    # (e.g. to resolve a relative 'choices_file' against its directory).
+    stream = io.BytesIO(text)
+    stream.name = path
+    return stream
+
+
+def _check_one(task):
+    path, options = task
+    try:
+        _make_parser(options)(_named(_read(path), path))
+    except Exception as e:
+        return _error(path, e)
+    return {'path': path, 'status': 'ok'}
+
+
+def _compile_one(task):
+    path, target, force, options = task
+    try:
+        text = _read(path)
+        if not force and _up_to_date(target, text, options):
+            return {'path': path, 'status': 'cached', 'artifact': target}
+        schema = _make_parser(options)(_named(text, path))
+        data = compiled.dumps(schema, text, options)
+        directory = os.path.dirname(target)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(target, 'wb') as f:
+            f.write(data)
+    except Exception as e:
+        return _error(path, e)
+    return {'path': path, 'status': 'compiled', 'artifact': target}
+
+
+def _up_to_date(target, text, options):
+    # Artifacts which cannot be read (missing, truncated, corrupt or of
+    # an older format) are stale.
+    try:
+        recorded = compiled.source_digest(_read(target))
+    except Exception:
+        return False
+    return recorded == compiled.digest(text, options)
+
+
+def _bench_one(task):
+    path, samples, repeat, options = task
+    result = {'path': path, 'status': 'ok', 'repeat': repeat}
+    try:
+        text = _read(path)
+        parser = _make_parser(options)
+        timings = []
+        for i in range(repeat):
+            stream = _named(text, path)
+            start = perf_counter()
+            schema = parser(stream)
+            timings.append(perf_counter() - start)
+        result['parse'] = _summarize(timings)
+        if samples is not None:
+            timings = []
+            invalid = 0
+            for i in range(repeat):
+                start = perf_counter()
+                for cstruct in samples:
+                    try:
+                        schema.deserialize(cstruct)
+                    except colander.Invalid:
+                        invalid += 1
+                timings.append(perf_counter() - start)
+            result['deserialize'] = _summarize(timings)
+            result['samples'] = len(samples)
+            result['invalid'] = invalid // repeat
+    except Exception as e:
+        return _error(path, e)
+    return result
+
+
+def _load_samples(path):
+    with open(path, 'rb') as f:
+        samples = yaml.safe_load(f)
+    if not isinstance(samples, list):
+        samples = [samples]
+    return samples
+
+
+def _summarize(timings):
+    return {
+        'min': min(timings),
+        'mean': sum(timings) / len(timings),
+        'max': max(timings),
+    }
+
+
+def _error(path, exc):
+    result = {
+        'path': path,
+        'status': 'error',
+        'error': '%s: %s' % (exc.__class__.__name__, exc),
+        'line': None,
+        'column': None,
+    }
+    if isinstance(exc, yaml.MarkedYAMLError):
+        mark = exc.problem_mark or exc.context_mark
+        if exc.context:
+            result['error'] = '%s: %s' % (exc.context, exc.problem)
+        else:
+            result['error'] = exc.problem
+        if mark is not None:
+            result['line'] = mark.line + 1
+            result['column'] = mark.column + 1
+    return result
+
+
+def _format_error(result):
+    if result['line'] is not None:
+        return '%s:%d:%d: %s' % (result['path'], result['line'],
+                                 result['column'], result['error'])
+    return '%s: %s' % (result['path'], result['error'])
+
+
+def _format_check(results, out):
+    errors = [x for x in results if x['status'] == 'error']
+    for result in errors:
+        out.write(_format_error(result) + '\n')
+    out.write('%d file(s) checked, %d error(s)\n' % (len(results),
+                                                     len(errors)))
+
+
+def _format_compile(results, out):
+    counts = {'compiled': 0, 'cached': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+        if result['status'] == 'error':
+            out.write(_format_error(result) + '\n')
+        else:
+            out.write('%s -> %s (%s)\n' % (result['path'],
+                                           result['artifact'],
+                                           result['status']))
+    out.write('%(compiled)d compiled, %(cached)d up to date, '
+              '%(error)d error(s)\n' % counts)
+
+
+def _format_bench(results, out):
+    for result in results:
+        if result['status'] == 'error':
+            out.write(_format_error(result) + '\n')
+            continue
+        out.write('%s\n' % result['path'])
+        parse = result['parse']
+        out.write('  parse:       min %.6fs  mean %.6fs  max %.6fs\n'
+                  % (parse['min'], parse['mean'], parse['max']))
+        if 'deserialize' in result:
+            timing = result['deserialize']
+            per_sample = timing['mean'] / max(result['samples'], 1)
+            out.write('  deserialize: min %.6fs  mean %.6fs  max %.6fs  '
+                      '(%d samples, %d invalid, %.1f us/sample)\n'
+                      % (timing['min'], timing['mean'], timing['max'],
+                         result['samples'], result['invalid'],
+                         per_sample * 1000000))
@@ -0,0 +1,66 @@
+import hashlib
+import io
+import json
+import pickle
+
+FORMAT_VERSION = 1
+
+
+def digest(text, options=None):
+    """ Return a digest identifying the source 'text' of a schema.
+
+    If passed, 'options' (a JSON-serializable dict, e.g. of the options
+    of the parser) is included in the digest.
+    """
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    sha = hashlib.sha1(text)
+    if options is not None:
+        sha.update(b'\0')
+        sha.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def dumps(schema, text, options=None):
+    """ Return 'schema' (parsed from 'text') as a compiled artifact.
+
+    The artifact holds two pickles:  a header recording the format version
+    and the digest of the source text and 'options' (so that stale
+    artifacts can be detected without loading the schema), followed by the
+    schema itself.  Schemas whose validators or widgets cannot be pickled
+    (e.g., lambdas) cannot be compiled.
+
+    Files the schema refers to (e.g., a ``choices_file``) are not part of
+    the digest.
+    """
+    f = io.BytesIO()
+    pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+    pickler.dump((FORMAT_VERSION, digest(text, options)))
+    pickler.dump(schema)
+    return f.getvalue()
+
+
+def loads(data, text=None, options=None):
+    """ Return the schema from a compiled artifact.
+
+    If 'text' is passed, raise ValueError unless the artifact was compiled
+    from it, with the same 'options'.
+    """
+    unpickler = pickle.Unpickler(io.BytesIO(data))
+    source_digest = _check_header(unpickler.load())
+    if text is not None and digest(text, options) != source_digest:
+        raise ValueError('artifact is stale')
+    return unpickler.load()
+
+
+def source_digest(data):
+    """ Return the digest of the source text recorded in an artifact.
+    """
+    return _check_header(pickle.Unpickler(io.BytesIO(data)).load())
+
+
+def _check_header(header):
+    version, source_digest = header
+    if version != FORMAT_VERSION:
+        raise ValueError('unsupported artifact version: %r' % (version,))
+    return source_digest
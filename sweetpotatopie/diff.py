@@ -0,0 +1,216 @@
+""" Compare versions of a schema document, and rebuild only what changed.
+
+Schema nodes are identified by their path:  the dotted names of the node
+and its ancestors (the root's path is its name, possibly empty).  Unnamed
+nodes, and later nodes repeating a sibling's name, are identified by their
+position, e.g. ``phones.[0]``.
+"""
+import collections
+import hashlib
+
+import yaml
+from yaml.nodes import MappingNode
+from yaml.nodes import ScalarNode
+from yaml.nodes import SequenceNode
+
+from .parsers import SchemaParser
+
+_Entry = collections.namedtuple('_Entry', ['node', 'own', 'tree'])
+
+
+class SchemaDiff(object):
+    """ The structural differences between two versions of a schema.
+
+    'added' and 'changed' list paths in the new version, 'removed' paths
+    in the old one, each in document order.  A node is 'changed' if its
+    own definition (tag, name, type arguments, validator, etc.) changed,
+    but not if only its children did.
+
+    'affected' lists the paths whose schema nodes are not the same in
+    both versions:  the added and changed nodes, and their ancestors, in
+    the new version, followed by the removed nodes.
+    """
+
+    def __init__(self, added, removed, changed, affected):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.affected = affected
+
+    def __bool__(self):
+        return bool(self.affected)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '<SchemaDiff added=%r removed=%r changed=%r>' % (
+            self.added, self.removed, self.changed)
+
+
+def diff(old_text, new_text, loader_class=yaml.Loader):
+    """ Return the :class:`SchemaDiff` between two versions of a schema
+    document.
+
+    The documents are composed, but not constructed:  no schema nodes are
+    built, and no Python names resolved.
+    """
+    old = _index(loader_class(old_text).get_single_node())
+    new = _index(loader_class(new_text).get_single_node())
+    return _compare(_digests(old), _digests(new))
+
+
+class IncrementalParser(object):
+    """ Parse successive versions of a schema document, reusing the schema
+    nodes of unchanged subtrees from the previous version.
+
+    Each call parses a new version, using 'parser' (a
+    :class:`sweetpotatopie.parsers.SchemaParser` by default, always
+    composing the node graph, even if created with ``streaming=True``).
+    Subtrees identical (at the same path) to the previous version are not
+    constructed again:  the new schema holds the previous schema nodes, so
+    caches keyed on them stay valid.  After each call, 'schema' holds the
+    schema and 'diff' its :class:`SchemaDiff` from the previous version
+    (for the first version, everything is added).
+    """
+
+    def __init__(self, parser=None):
+        if parser is None:
+            parser = SchemaParser()
+        self.parser = parser
+        self.schema = None
+        self.diff = None
+        self._previous = collections.OrderedDict()
+
+    def __call__(self, text):
+        loader = self.parser._make_loader(text)
+        root = loader.get_single_node()
+        index = _index(root)
+        # Seed PyYAML's table of constructed objects with the nodes to
+        # reuse:  it consults the table before constructing a node.
+        objects = loader.constructed_objects
+        for path, entry in index.items():
+            previous = self._previous.get(path)
+            if previous is not None and previous[1] == entry.tree:
+                objects[entry.node] = previous[2]
+        schema = None
+        if root is not None:
+            schema = loader.construct_document(root)
+        digests = _digests(index)
+        self.diff = _compare(self._previous, digests)
+        self._previous = collections.OrderedDict(
+            (path, digests[path] + (objects[entry.node],))
+            for path, entry in index.items() if entry.node in objects)
+        self.schema = schema
+        return schema
+
+
+def _is_schema_node(node):
+    return (isinstance(node, MappingNode) and
+            (node.tag == '!schema' or node.tag.startswith('!field.')))
+
+
+def _index(root):
+    # Map the path of each schema node in the document rooted at 'root'
+    # to its _Entry, in document order.
+    index = collections.OrderedDict()
+    if root is None:
+        return index
+    hasher = _Hasher()
+
+    def _walk(node, path):
+        children = None
+        own = []
+        for key, value in node.value:
+            if isinstance(key, ScalarNode) and key.value == 'children':
+                children = value
+            else:
+                own.append((key, value))
+        index[path] = _Entry(node, hasher.mapping(node.tag, own),
+                             hasher.digest(node))
+        if not isinstance(children, SequenceNode):
+            return
+        nodes = [x for x in children.value if _is_schema_node(x)]
+        prefix = path + '.' if path else ''
+        for child, segment in zip(nodes, _segments(map(_name, nodes))):
+            _walk(child, prefix + segment)
+
+    if _is_schema_node(root):
+        _walk(root, _name(root) or '')
+    return index
+
+
+def _name(node):
+    for key, value in node.value:
+        if (isinstance(key, ScalarNode) and key.value == 'name' and
+                isinstance(value, ScalarNode)):
+            return value.value
+    return None
+
+
+def _segments(names):
+    seen = set()
+    segments = []
+    for position, name in enumerate(names):
+        if not name or name in seen:
+            segments.append('%s[%d]' % (name or '', position))
+        else:
+            segments.append(name)
+        seen.add(name)
+    return segments
+
+
+def _digests(index):
+    return collections.OrderedDict((path, (entry.own, entry.tree))
+                                   for path, entry in index.items())
+
+
+def _compare(old, new):
+    # 'old' and 'new' map paths to tuples starting with their own and
+    # tree digests.
+    added = [path for path in new if path not in old]
+    removed = [path for path in old if path not in new]
+    changed = [path for path in new
+               if path in old and old[path][0] != new[path][0]]
+    affected = [path for path in new
+                if path not in old or old[path][1] != new[path][1]]
+    return SchemaDiff(added, removed, changed, affected + removed)
+
+
+class _Hasher(object):
+    """ Digest YAML nodes by their content, rather than their layout.
+
+    Mapping keys are unordered;  aliased nodes are digested by content.
+    """
+
+    def __init__(self):
+        self._digests = {}
+        self._active = set()
+
+    def digest(self, node):
+        try:
+            return self._digests[node]
+        except KeyError:
+            pass
+        if node in self._active:  # recursive structure
+            return 'recursive'
+        self._active.add(node)
+        try:
+            if isinstance(node, ScalarNode):
+                result = self._hash(('scalar', node.tag, node.value))
+            elif isinstance(node, SequenceNode):
+                result = self._hash(('sequence', node.tag,
+                                     [self.digest(x) for x in node.value]))
+            else:
+                result = self.mapping(node.tag, node.value)
+        finally:
+            self._active.discard(node)
+        self._digests[node] = result
+        return result
+
+    def mapping(self, tag, pairs):
+        items = sorted((self.digest(key), self.digest(value))
+                       for key, value in pairs)
+        return self._hash(('mapping', tag, items))
+
+    def _hash(self, data):
+        return hashlib.sha1(repr(data).encode('utf-8')).hexdigest()
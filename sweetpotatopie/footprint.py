@@ -0,0 +1,148 @@
+import sys
+import types
+
+import colander
+
+from ._compat import string_types
+from .parsers import _tags_by_type
+
+
+class Footprint(object):
+    """ Memory used by a schema, as measured by :func:`measure`.
+
+    All sizes are in bytes, as reported by ``sys.getsizeof``.  Objects
+    shared between nodes are counted once, for the first node (in
+    depth-first order) which refers to them.
+
+    - 'total' is the size of the whole schema.
+
+    - 'by_category' breaks the total down into 'nodes' (the nodes
+      themselves, their attribute dicts and child lists), 'types',
+      'validators', 'widgets', 'strings' (string attributes of the nodes,
+      e.g. names, titles and descriptions) and 'other' attributes.
+
+    - 'by_type' and 'by_tag' break the total down by the node's colander
+      type, and by the tag which builds nodes of that type.
+
+    - 'by_path' maps the dotted path of each node to the size of the
+      subtree rooted there.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_category = dict.fromkeys(
+            ['nodes', 'types', 'validators', 'widgets', 'strings', 'other'], 0)
+        self.by_type = {}
+        self.by_tag = {}
+        self.by_path = {}
+
+    def format(self, limit=10):
+        """ Return a text summary, listing the 'limit' largest entries of
+        each breakdown.
+        """
+        lines = ['total: %d bytes' % self.total]
+        for title, sizes in [('category', self.by_category),
+                             ('type', self.by_type),
+                             ('tag', self.by_tag),
+                             ('path', self.by_path)]:
+            lines.append('by %s:' % title)
+            ranked = sorted(sizes.items(), key=lambda x: (-x[1], x[0]))
+            for key, size in ranked[:limit]:
+                lines.append('  %10d  %s' % (size, key))
+        return '\n'.join(lines)
+
+
+_CATEGORIES = {
+    'typ': 'types',
+    'validator': 'validators',
+    'widget': 'widgets',
+}
+
+
+def measure(schema):
+    """ Return the :class:`Footprint` of 'schema'.
+    """
+    footprint = Footprint()
+    tags = _tags_by_type('field_type')
+    seen = set()
+
+    def _walk(node, path, is_root):
+        if path:
+            path = '%s.%s' % (path, _segment(node))
+        else:
+            path = _segment(node)
+        size = _size(node, seen) + _size(node.__dict__, seen)
+        children = node.children
+        size += _size(children, seen)
+        footprint.by_category['nodes'] += size
+        for name, value in node.__dict__.items():
+            if name == 'children':
+                continue
+            if name in _CATEGORIES:
+                category = _CATEGORIES[name]
+            elif isinstance(value, string_types):
+                category = 'strings'
+            else:
+                category = 'other'
+            value_size = _deep_size(value, seen)
+            footprint.by_category[category] += value_size
+            size += value_size
+        typ = node.typ.__class__
+        if is_root and typ is colander.Mapping:
+            tag = '!schema'
+        else:
+            tag = tags.get(typ, '<%s>' % typ.__name__)
+        footprint.by_type[typ.__name__] = (
+            footprint.by_type.get(typ.__name__, 0) + size)
+        footprint.by_tag[tag] = footprint.by_tag.get(tag, 0) + size
+        subtree = size
+        for child in children:
+            subtree += _walk(child, path, False)
+        footprint.by_path[path] = footprint.by_path.get(path, 0) + subtree
+        return subtree
+
+    footprint.total = _walk(schema, '', True)
+    return footprint
+
+
+def _segment(node):
+    return node.name or '<%s>' % node.typ.__class__.__name__
+
+
+_SHARED = (type, types.ModuleType, types.FunctionType,
+           types.BuiltinFunctionType, types.MethodType)
+
+
+def _size(obj, seen):
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    return sys.getsizeof(obj)
+
+
+def _deep_size(obj, seen):
+    # Sum the sizes of 'obj' and the objects it refers to, skipping those
+    # already seen, and classes, modules and functions (shared code).
+    total = 0
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        if isinstance(obj, string_types):
+            continue
+        attrs = getattr(obj, '__dict__', None)
+        if isinstance(attrs, dict):
+            pending.append(attrs)
+        for klass in type(obj).__mro__:
+            for slot in getattr(klass, '__slots__', ()):
+                if hasattr(obj, slot):
+                    pending.append(getattr(obj, slot))
+    return total
@@ -0,0 +1,40 @@
+from ._compat import intern
+from ._compat import string_types
+
+
+class Interner(object):
+    """ Share equal strings between the values built by a parser.
+
+    :class:`sweetpotatopie.parsers.SchemaParser` (when created with
+    ``intern=True``) passes each mapping through :meth:`mapping` before
+    constructing a tagged value from it, using a new interner for each
+    parse.  Only strings, which are immutable, are shared:  schema types
+    and other values are never shared between nodes.
+    """
+
+    def __init__(self):
+        self._strings = {}
+
+    def string(self, value):
+        """ Return the shared copy of string 'value'.
+        """
+        try:
+            return intern(value)
+        except TypeError:  # not a plain 'str'
+            return self._strings.setdefault(value, value)
+
+    def mapping(self, mapping):
+        """ Return a copy of 'mapping', with its keys and string values
+        (including those of nested mappings, e.g. 'type_args') replaced by
+        their shared copies.
+        """
+        result = {}
+        for key, value in mapping.items():
+            if isinstance(key, string_types):
+                key = self.string(key)
+            if isinstance(value, string_types):
+                value = self.string(value)
+            elif type(value) is dict:
+                value = self.mapping(value)
+            result[key] = value
+        return result
@@ -0,0 +1,271 @@
+""" Export schemas as JSON Schema (draft 7) documents.
+
+The exported document lets a validator in front of the application
+reject malformed payloads cheaply, without rejecting any payload which
+colander accepts.  Colander coerces the values of numbers and booleans
+(e.g., accepting "42" or 4.7 as an integer, and "yes" as a boolean), so
+their JSON type is left unchecked, as are the validators whose outcome
+depends on the coercion;  with ``strict=True``, the document describes
+only the JSON-native form of the data (numbers as JSON numbers, booleans
+as JSON booleans), rejecting the other forms.
+
+Only constraints with an exact JSON Schema equivalent are exported.  The
+others (e.g., ``!validator.function``, or validators on nodes which have a
+preparer) are listed, by tag, under the :data:`UNCHECKED` keyword of the
+node's schema:  the application must still deserialize the data against
+the colander schema, which checks everything.
+"""
+import re
+
+import colander
+
+from ._compat import string_types
+from .parsers import _tags_by_type
+
+DRAFT = 'http://json-schema.org/draft-07/schema#'
+UNCHECKED = 'x-sweetpotatopie-unchecked'
+
+_NUMBER_TYPES = (colander.Integer, colander.Float, colander.Decimal,
+                 colander.Money)
+_SCALAR_TYPES = {
+    colander.String: {'type': 'string'},
+    colander.Integer: {'type': 'integer'},
+    colander.Float: {'type': 'number'},
+    colander.Decimal: {'type': 'number'},
+    colander.Money: {'type': 'number'},
+    colander.Boolean: {'type': 'boolean'},
+    colander.DateTime: {'type': 'string'},
+    colander.Date: {'type': 'string'},
+    colander.Time: {'type': 'string'},
+}
+# Types accepting more forms than any JSON Schema 'format' (e.g., '10:00'
+# as a time, or '2013-04-12' as a date-time):  their check is unchecked.
+_LENIENT_TYPES = (colander.DateTime, colander.Date, colander.Time)
+# Types coercing their value, e.g. with int() or str():  their JSON type
+# is unchecked, unless exporting strictly.
+_COERCED_TYPES = _NUMBER_TYPES + (colander.Boolean,)
+# Types which deserialize JSON null (and other false values) as missing.
+_NULLABLE_TYPES = (colander.String, colander.Number, colander.DateTime,
+                   colander.Date, colander.Time)
+# Python-only regular expression syntax.
+_PYTHON_REGEX = re.compile(r'\(\?P|\(\?[aiLmsux]|\\[AZ]')
+_JSON_SCALARS = string_types + (bool, int, float, type(None))
+
+
+def to_json_schema(schema, strict=False):
+    """ Return the JSON Schema document (a dict) for 'schema'.
+
+    If 'strict' is true, numbers and booleans must be given as JSON numbers
+    and booleans, although colander also accepts other forms.
+    """
+    exporter = _Exporter(_tags_by_type('field_type'),
+                         _tags_by_type('validator_type'), strict)
+    document = {'$schema': DRAFT}
+    document.update(exporter.node(schema))
+    return document
+
+
+def find_unchecked(document):
+    """ Return the constraints of 'document' left unchecked by its schema.
+
+    Return a list of ``(pointer, tags)`` tuples, where 'pointer' is the
+    JSON pointer of the schema node, in document order.
+    """
+    found = []
+    seen = set()
+
+    def _walk(schema, pointer):
+        if id(schema) in seen:  # e.g., the item of a scalar-accepting list
+            return
+        seen.add(id(schema))
+        if UNCHECKED in schema:
+            found.append((pointer or '/', schema[UNCHECKED]))
+        for name, child in schema.get('properties', {}).items():
+            _walk(child, '%s/properties/%s' % (pointer, _escape(name)))
+        items = schema.get('items')
+        if isinstance(items, dict):
+            _walk(items, pointer + '/items')
+        elif items is not None:
+            for index, child in enumerate(items):
+                _walk(child, '%s/items/%d' % (pointer, index))
+        for index, branch in enumerate(schema.get('anyOf', ())):
+            _walk(branch, '%s/anyOf/%d' % (pointer, index))
+
+    _walk(document, '')
+    return found
+
+
+def _escape(name):
+    return name.replace('~', '~0').replace('/', '~1')
+
+
+class _Exporter(object):
+
+    def __init__(self, field_tags, validator_tags, strict=False):
+        self.field_tags = field_tags
+        self.validator_tags = validator_tags
+        self.strict = strict
+
+    def node(self, node):
+        result = {}
+        value = {}
+        unchecked = []
+        if node.title:
+            result['title'] = node.title
+        if node.description:
+            result['description'] = node.description
+        typ = node.typ
+        if isinstance(typ, colander.Mapping):
+            self._mapping(node, value)
+        elif isinstance(typ, colander.Tuple):
+            items = [self.node(child) for child in node.children]
+            value.update({'type': 'array', 'items': items,
+                          'minItems': len(items), 'maxItems': len(items)})
+        elif isinstance(typ, colander.Sequence):
+            value['type'] = 'array'
+            if node.children:
+                value['items'] = self.node(node.children[0])
+        elif isinstance(typ, colander.Set):
+            value['type'] = 'array'
+        elif type(typ) in _SCALAR_TYPES:
+            coerced = not self.strict and isinstance(typ, _COERCED_TYPES)
+            if not coerced:
+                value.update(_SCALAR_TYPES[type(typ)])
+            if coerced or isinstance(typ, _LENIENT_TYPES):
+                unchecked.append(self._describe(typ, self.field_tags))
+        else:
+            unchecked.append(self._describe(typ, self.field_tags))
+        validator = node.validator
+        if validator is not None:
+            if node.preparer is not None:
+                # Validators see the prepared value, not the JSON one.
+                unchecked.append(self._describe(validator,
+                                                self.validator_tags))
+            else:
+                constraints = []
+                self._validator(validator, typ, constraints, unchecked)
+                _merge(value, constraints)
+        if isinstance(typ, colander.Sequence) and typ.accept_scalar:
+            # A lone item is accepted as a one-item list.
+            value = {'anyOf': [value, value.get('items', {})]}
+        if not node.required and isinstance(typ, _NULLABLE_TYPES):
+            # Null and (usually) empty values are deserialized as missing,
+            # without running the validators.
+            empty = [None]
+            if not getattr(typ, 'allow_empty', False):
+                empty.append('')
+            result['anyOf'] = [{'enum': empty}, value]
+        else:
+            result.update(value)
+        if unchecked:
+            result[UNCHECKED] = unchecked
+        return result
+
+    def _mapping(self, node, result):
+        result['type'] = 'object'
+        properties = result['properties'] = {}
+        required = []
+        for child in node.children:
+            properties[child.name] = self.node(child)
+            if child.required:
+                required.append(child.name)
+        if required:
+            result['required'] = required
+        if node.typ.unknown == 'raise':
+            result['additionalProperties'] = False
+
+    def _validator(self, validator, typ, constraints, unchecked):
+        if isinstance(validator, colander.All):
+            for member in validator.validators:
+                self._validator(member, typ, constraints, unchecked)
+            return
+        constraint = _convert(validator, typ, self.strict)
+        if constraint is None:
+            unchecked.append(self._describe(validator, self.validator_tags))
+        else:
+            constraints.append(constraint)
+
+    def _describe(self, obj, tags):
+        # The tag building 'obj', else the name of the function or class.
+        klass = type(obj)
+        tag = tags.get(klass)
+        if tag is not None:
+            return tag
+        return getattr(obj, '__name__', None) or klass.__name__
+
+
+def _convert(validator, typ, strict):
+    # Return the JSON Schema keywords equivalent to 'validator' for
+    # values of 'typ', or None if there are none.
+    if not strict and isinstance(typ, _COERCED_TYPES):
+        # The validator sees the coerced value:  only the bounds of types
+        # which keep JSON numbers as they are still apply (to numbers;
+        # JSON Schema ignores them for other values).
+        if not (isinstance(validator, colander.Range) and _exact(typ)):
+            return None
+    if isinstance(validator, colander.Range):
+        if not isinstance(typ, _NUMBER_TYPES):
+            return None
+        result = {}
+        for bound, keyword in ((validator.min, 'minimum'),
+                               (validator.max, 'maximum')):
+            if bound is None:
+                continue
+            if isinstance(bound, bool) or not isinstance(bound, (int, float)):
+                return None
+            result[keyword] = bound
+        return result
+    if isinstance(validator, colander.Length):
+        if isinstance(typ, colander.String):
+            keywords = ('minLength', 'maxLength')
+        elif isinstance(typ, (colander.Sequence, colander.Tuple)):
+            keywords = ('minItems', 'maxItems')
+        else:
+            return None
+        result = {}
+        for bound, keyword in zip((validator.min, validator.max), keywords):
+            if bound is not None:
+                result[keyword] = bound
+        return result
+    if isinstance(validator, colander.Regex):
+        if not isinstance(typ, colander.String):
+            return None
+        match_object = validator.match_object
+        pattern = match_object.pattern
+        if (match_object.flags & ~re.UNICODE or
+                not isinstance(pattern, string_types) or
+                _PYTHON_REGEX.search(pattern)):
+            return None
+        return {'pattern': '^(?:%s)' % pattern}  # re.match is anchored
+    if isinstance(validator, colander.OneOf):
+        choices = list(validator.choices)
+        for choice in choices:
+            if not isinstance(choice, _JSON_SCALARS):
+                return None
+        return {'enum': choices}
+    return None
+
+
+def _exact(typ):
+    # Integers truncate floats, and quantized decimals round them.
+    if isinstance(typ, colander.Float):
+        return True
+    return (isinstance(typ, colander.Decimal) and
+            not isinstance(typ, colander.Money) and typ.quant is None)
+
+
+def _merge(result, constraints):
+    # Merge the keywords of 'constraints' into 'result', falling back to
+    # 'allOf' when two constraints use the same keyword.
+    seen = set(result)
+    merged = {}
+    clashing = []
+    for constraint in constraints:
+        if seen.intersection(constraint):
+            clashing.append(constraint)
+        else:
+            seen.update(constraint)
+            merged.update(constraint)
+    result.update(merged)
+    if clashing:
+        result['allOf'] = clashing
@@ -0,0 +1,139 @@
+import threading
+
+import colander
+
+
+class _Stop(Exception):
+    """ Raised through colander's compound types once the limit is reached.
+
+    Not a subclass of :exc:`colander.Invalid`, so the compound types do not
+    catch it, and stop iterating over their children at once.
+    """
+
+
+class _Frame(object):
+
+    def __init__(self, node, cstruct):
+        self.node = node
+        self.cstruct = cstruct
+        self.errors = []
+        self.cursor = 0
+        self.calls = 0
+        self.last = -1
+
+
+class ErrorLimiter(object):
+    """ Deserialize against 'schema', giving up after 'max_errors' errors.
+
+    With the default 'max_errors' of 1, deserialization fails fast, at the
+    first invalid value.  Until the limit is reached, errors are reported
+    exactly as by ``schema.deserialize``;  once it is reached, no further
+    values are deserialized or validated, and the :exc:`colander.Invalid`
+    raised holds only the errors found so far.
+
+    Every :exc:`colander.Invalid` raised carries ``truncated`` (whether
+    any values were left unchecked once the limit was reached),
+    ``error_count`` (the number of errors found, which is 'max_errors'
+    when truncated) and ``unchecked`` (the number of sibling values left
+    unchecked along the way).  Errors past the limit
+    are not counted:  ``unchecked`` is the only summary of what was
+    skipped.
+
+    The schema is cloned, and the instrumentation applied only to the
+    clone:  neither 'schema' nor colander itself is modified.
+    """
+
+    def __init__(self, schema, max_errors=1):
+        if max_errors < 1:
+            raise ValueError('max_errors must be at least 1')
+        self.max_errors = max_errors
+        self._schema = schema.clone()
+        self._local = threading.local()
+        self._instrument(self._schema, None)
+
+    def deserialize(self, cstruct=colander.null):
+        """ Deserialize 'cstruct', as ``schema.deserialize`` would.
+        """
+        state = self._local
+        state.frames = [_Frame(None, None)]
+        state.count = 0
+        state.unchecked = 0
+        try:
+            return self._schema.deserialize(cstruct)
+        except _Stop:
+            error = state.frames[0].errors[0][0]
+            error.truncated = state.unchecked > 0
+            error.error_count = state.count
+            error.unchecked = state.unchecked
+            raise error
+        except colander.Invalid as e:
+            e.truncated = False
+            e.error_count = state.count
+            e.unchecked = 0
+            raise
+        finally:
+            del state.frames
+
+    def _instrument(self, node, index):
+        deserialize = node.__class__.deserialize.__get__(node)
+        limiter = self
+
+        def _deserialize(cstruct=colander.null):
+            state = limiter._local
+            frames = getattr(state, 'frames', None)
+            if frames is None:  # called outside of limiter.deserialize
+                return deserialize(cstruct)
+            parent = frames[-1]
+            pos = _position(parent, index, cstruct)
+            frame = _Frame(node, cstruct)
+            frames.append(frame)
+            try:
+                return deserialize(cstruct)
+            except colander.Invalid as e:
+                if not e.children:
+                    state.count += 1
+                parent.errors.append((e, pos))
+                if state.count >= limiter.max_errors:
+                    raise _Stop()
+                raise
+            except _Stop:
+                error = colander.Invalid(node)
+                for exc, exc_pos in frame.errors:
+                    error.add(exc, exc_pos)
+                state.unchecked += _remaining(frame)
+                parent.errors.append((error, pos))
+                raise
+            finally:
+                frames.pop()
+
+        node.deserialize = _deserialize
+        for num, child in enumerate(node.children):
+            self._instrument(child, num)
+
+
+def _position(frame, index, cstruct):
+    # Work out the position colander's compound type passes to
+    # ``Invalid.add`` for the child being called:  its index among the
+    # parent's children, or (for sequences) the index of its value.
+    frame.calls += 1
+    if isinstance(getattr(frame.node, 'typ', None), colander.Sequence):
+        value = frame.cstruct
+        if isinstance(value, (list, tuple)):
+            for num in range(frame.cursor, len(value)):
+                if value[num] is cstruct:
+                    frame.cursor = num + 1
+                    frame.last = num
+                    return num
+        frame.last = frame.calls - 1
+        return frame.last
+    frame.last = index
+    return index
+
+
+def _remaining(frame):
+    if isinstance(frame.node.typ, colander.Sequence):
+        value = frame.cstruct
+        total = len(value) if isinstance(value, (list, tuple)) else 0
+    else:
+        total = len(frame.node.children)
+    return max(total - frame.last - 1, 0)
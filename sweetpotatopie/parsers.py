@@ -1,9 +1,17 @@
+import os
+
 import colander
 import deform
 import yaml
 from zope.interface import implementer
 
+from . import plugins
+from .choices import Choices
+from .choices import load_choices
 from .interfaces import IParser
+from .interning import Interner
+from .positions import construction_error
+from .streaming import EventBuilder
 from ._compat import u
 
 """
@@ -30,84 +38,157 @@ def _typed_node(typ, mapping):
 
 
 def _field(field_type):
-    def _nested(loader, node):
-        mapping = loader.construct_mapping(node, deep=True)
+    def _nested(mapping):
         return _typed_node(field_type, mapping)
+    _nested.field_type = field_type
     return _nested
 
 
 def _validator(klass):
-    def _nested(loader, node):
-        mapping = loader.construct_mapping(node, deep=True)
+    def _nested(mapping):
         return klass(**mapping)
+    _nested.validator_type = klass
     return _nested
 
 
-def _one_of(loader, node):
-    mapping = loader.construct_mapping(node, deep=True)
-    choices = mapping.pop('choices')
+def _one_of(mapping, mark=None):
+    if 'choices_file' in mapping:
+        if 'choices' in mapping:
+            raise ValueError("pass only one of 'choices' or 'choices_file'")
+        choices = load_choices(_choices_path(mapping.pop('choices_file'),
+                                             mark))
+    else:
+        choices = Choices(mapping.pop('choices'))
     return colander.OneOf(choices, **mapping)
 
 
-def _all(loader, node):
-    mapping = loader.construct_mapping(node, deep=True)
+_one_of.validator_type = colander.OneOf
+_one_of.takes_mark = True
+
+
+def _choices_path(path, mark):
+    # Relative paths are relative to the directory of the schema file;
+    # schemas parsed from strings (marks named e.g. '<unicode string>')
+    # have none.
+    if os.path.isabs(path):
+        return path
+    source = getattr(mark, 'name', None)
+    if not source or source.startswith('<'):
+        raise ValueError('relative choices_file %r requires a schema read '
+                         'from a named file' % path)
+    return os.path.join(os.path.dirname(source), path)
+
+
+def _all(mapping):
     validators = mapping.pop('validators')
     return colander.All(*validators, **mapping)
 
+
+_all.validator_type = colander.All
+
+
 def _widget(widget_type):
-    def _nested(loader, node):
-        mapping = loader.construct_mapping(node, deep=True)
+    def _nested(mapping):
         return widget_type(**mapping)
     return _nested
 
 
+def _constructor(tag, build):
+    """ Wrap 'build' (a callable taking a mapping) as a YAML constructor.
+
+    'build' is exposed as an attribute of the constructor, so that callers
+    which already have the mapping in hand can bypass the node graph.
+    Builders with a true ``takes_mark`` attribute are also passed the
+    start mark of the node.
+    """
+    def _nested(loader, node):
+        interner = getattr(loader, 'interner', None)
+        try:
+            mapping = loader.construct_mapping(node, deep=True)
+            if interner is not None:
+                mapping = interner.mapping(mapping)
+            if getattr(build, 'takes_mark', False):
+                value = build(mapping, node.start_mark)
+            else:
+                value = build(mapping)
+        except Exception as e:
+            raise construction_error(e, tag, node, node.start_mark)
+        source_map = getattr(loader, 'source_map', None)
+        if source_map is not None and isinstance(value, colander.SchemaNode):
+            source_map.add(value, node.start_mark, node.end_mark)
+        return value
+    _nested.build = build
+    return _nested
+
+
+def _builders():
+    return [
+        (u('!field.string'), _field(colander.String)),
+        (u('!field.integer'), _field(colander.Integer)),
+        (u('!field.float'), _field(colander.Float)),
+        (u('!field.decimal'), _field(colander.Decimal)),
+        (u('!field.money'), _field(colander.Money)),
+        (u('!field.boolean'), _field(colander.Boolean)),
+        (u('!field.datetime'), _field(colander.DateTime)),
+        (u('!field.date'), _field(colander.Date)),
+        (u('!field.time'), _field(colander.Time)),
+        (u('!field.tuple'), _field(colander.Tuple)),
+        (u('!field.set'), _field(colander.Set)),
+        (u('!field.sequence'), _field(colander.Sequence)),
+        (u('!field.mapping'), _field(colander.Mapping)),
+        (u('!validator.function'), _validator(colander.Function)),
+        (u('!validator.regex'), _validator(colander.Regex)),
+        (u('!validator.email'), _validator(colander.Email)),
+        (u('!validator.range'), _validator(colander.Range)),
+        (u('!validator.length'), _validator(colander.Length)),
+        (u('!validator.one_of'), _one_of),
+        (u('!validator.all'), _all),
+        (u('!schema'), _field(colander.Mapping)),
+        (u('!widget.autocomplete'),
+            _widget(deform.widget.AutocompleteInputWidget)),
+        (u('!widget.checkbox'), _widget(deform.widget.CheckboxWidget)),
+        (u('!widget.checkboxes'),
+            _widget(deform.widget.CheckboxChoiceWidget)),
+        (u('!widget.checked'), _widget(deform.widget.CheckedInputWidget)),
+        (u('!widget.checked_password'),
+            _widget(deform.widget.CheckedPasswordWidget)),
+        (u('!widget.date'), _widget(deform.widget.DateInputWidget)),
+        (u('!widget.dateparts'), _widget(deform.widget.DatePartsWidget)),
+        (u('!widget.datetime'), _widget(deform.widget.DateTimeInputWidget)),
+        (u('!widget.hidden'), _widget(deform.widget.HiddenWidget)),
+        (u('!widget.input'), _widget(deform.widget.TextInputWidget)),
+        (u('!widget.input_csv'), _widget(deform.widget.TextInputCSVWidget)),
+        (u('!widget.money'), _widget(deform.widget.MoneyInputWidget)),
+        (u('!widget.password'), _widget(deform.widget.PasswordWidget)),
+        (u('!widget.radio'), _widget(deform.widget.RadioChoiceWidget)),
+        (u('!widget.richtext'), _widget(deform.widget.RichTextWidget)),
+        (u('!widget.select'), _widget(deform.widget.SelectWidget)),
+        (u('!widget.textarea_csv'),
+            _widget(deform.widget.TextAreaCSVWidget)),
+        (u('!widget.textarea'), _widget(deform.widget.TextAreaWidget)),
+        (u('!widget.upload'), _widget(deform.widget.FileUploadWidget)),
+    ]
+
+
+def _tags_by_type(attribute):
+    # Map the field / validator types exposed by the builders as
+    # 'attribute' back to the first tag which builds them.
+    tags = {}
+    for tag, build in _builders() + plugins.builders():
+        built = getattr(build, attribute, None)
+        if built is not None and tag != '!schema':
+            tags.setdefault(built, tag)
+    return tags
+
+
 def configure_loader(loader):
     if 'yaml_constructors' not in loader.__dict__:
         loader.yaml_constructors = loader.yaml_constructors.copy()
     ctors = loader.yaml_constructors
-    ctors[u('!field.string')] = _field(colander.String)
-    ctors[u('!field.integer')] = _field(colander.Integer)
-    ctors[u('!field.float')] = _field(colander.Float)
-    ctors[u('!field.decimal')] = _field(colander.Decimal)
-    ctors[u('!field.money')] = _field(colander.Money)
-    ctors[u('!field.boolean')] = _field(colander.Boolean)
-    ctors[u('!field.datetime')] = _field(colander.DateTime)
-    ctors[u('!field.date')] = _field(colander.Date)
-    ctors[u('!field.time')] = _field(colander.Time)
-    ctors[u('!field.tuple')] = _field(colander.Tuple)
-    ctors[u('!field.set')] = _field(colander.Set)
-    ctors[u('!field.sequence')] = _field(colander.Sequence)
-    ctors[u('!field.mapping')] = _field(colander.Mapping)
-    ctors[u('!validator.function')] = _validator(colander.Function)
-    ctors[u('!validator.regex')] = _validator(colander.Regex)
-    ctors[u('!validator.email')] = _validator(colander.Email)
-    ctors[u('!validator.range')] = _validator(colander.Range)
-    ctors[u('!validator.length')] = _validator(colander.Length)
-    ctors[u('!validator.one_of')] = _one_of
-    ctors[u('!validator.all')] = _all
-    ctors[u('!schema')] = _field(colander.Mapping)
-    ctors[u('!widget.autocomplete')] = _widget(
-                                        deform.widget.AutocompleteInputWidget)
-    ctors[u('!widget.checkbox')] = _widget(deform.widget.CheckboxWidget)
-    ctors[u('!widget.checkboxes')] = _widget(
-                                        deform.widget.CheckboxChoiceWidget)
-    ctors[u('!widget.checked')] = _widget(deform.widget.CheckedInputWidget)
-    ctors[u('!widget.checked_password')] = _widget(
-                                        deform.widget.CheckedPasswordWidget)
-    ctors[u('!widget.date')] = _widget(deform.widget.DateInputWidget)
-    ctors[u('!widget.dateparts')] = _widget(deform.widget.DatePartsWidget)
-    ctors[u('!widget.datetime')] = _widget(deform.widget.DateTimeInputWidget)
-    ctors[u('!widget.hidden')] = _widget(deform.widget.HiddenWidget)
-    ctors[u('!widget.input')] = _widget(deform.widget.TextInputWidget)
-    ctors[u('!widget.input_csv')] = _widget(deform.widget.TextInputCSVWidget)
-    ctors[u('!widget.money')] = _widget(deform.widget.MoneyInputWidget)
-    ctors[u('!widget.password')] = _widget(deform.widget.PasswordWidget)
-    ctors[u('!widget.radio')] = _widget(deform.widget.RadioChoiceWidget)
-    ctors[u('!widget.richtext')] = _widget(deform.widget.RichTextWidget)
-    ctors[u('!widget.select')] = _widget(deform.widget.SelectWidget)
-    ctors[u('!widget.textarea_csv')] = _widget(deform.widget.TextAreaCSVWidget)
-    ctors[u('!widget.textarea')] = _widget(deform.widget.TextAreaWidget)
-    ctors[u('!widget.upload')] = _widget(deform.widget.FileUploadWidget)
+    for tag, build in _builders():
+        ctors[tag] = _constructor(tag, build)
+    for tag, build in plugins.builders():
+        ctors[tag] = _constructor(tag, build)
     return loader
 
 
@@ -115,11 +196,49 @@ def configure_loader(loader):
 class SchemaParser(object):
     """ Create a profile tree from a YAML text.
 
+    If 'streaming' is true, build the schema directly from the YAML event
+    stream (see :class:`sweetpotatopie.streaming.EventBuilder`), rather than
+    composing the whole node graph first.
+
+    'loader_class' is the PyYAML loader used to parse the text.  If
+    'resolver' is passed (see :class:`sweetpotatopie.resolver.NameResolver`),
+    it handles the ``!!python/*`` tags which name Python objects, allowing
+    the use of a safe loader, e.g. ``yaml.CSafeLoader``.
+
+    If 'intern' is true, equal strings in the mappings passed to the
+    constructors (names, titles, descriptions, messages, type arguments,
+    etc.) are shared between the nodes built by each parse (see
+    :class:`sweetpotatopie.interning.Interner`).
+
+    Constructor failures are raised as
+    :exc:`sweetpotatopie.positions.SchemaConstructionError`, locating the
+    failing tag in the YAML source.
+
     See ../docs/declarative.rst for docs.
     """
 
-    def __call__(self, text):
+    def __init__(self, streaming=False, loader_class=yaml.Loader,
+                 resolver=None, intern=False):
+        self.streaming = streaming
+        self.loader_class = loader_class
+        self.resolver = resolver
+        self.intern = intern
+
+    def __call__(self, text, source_map=None):
         """ See IParser.
+
+        If 'source_map' (a :class:`sweetpotatopie.positions.SourceMap`) is
+        passed, record the source span of each schema node in it.
         """
-        loader = yaml.Loader(text)
-        return configure_loader(loader).get_single_data()
+        loader = self._make_loader(text, source_map)
+        if self.streaming:
+            return EventBuilder(loader).get_single_data()
+        return loader.get_single_data()
+
+    def _make_loader(self, text, source_map=None):
+        loader = configure_loader(self.loader_class(text))
+        loader.source_map = source_map
+        loader.interner = Interner() if self.intern else None
+        if self.resolver is not None:
+            self.resolver.configure(loader)
+        return loader
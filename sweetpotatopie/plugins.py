@@ -0,0 +1,120 @@
+import importlib
+import warnings
+
+from ._compat import string_types
+from ._compat import u
+
+ENTRY_POINT_GROUP = 'sweetpotatopie.tags'
+
+_KINDS = ('field', 'validator', 'widget')
+
+_registry = {}
+_entry_points_loaded = False
+
+
+def register(tag, target):
+    """ Register 'target' as the implementation of 'tag'.
+
+    'tag' must begin with ``!field.``, ``!validator.`` or ``!widget.`` (the
+    leading ``!`` is optional).  'target' is the colander type, validator
+    class or widget class (respectively) which the tag constructs, or a
+    ``'package.module:attribute'`` string naming it:  in that case, the
+    import is deferred until the tag is first used in a parsed document.
+
+    Tags registered here are added to every loader configured afterwards by
+    :func:`sweetpotatopie.parsers.configure_loader`.
+    """
+    tag = _normalize(tag)
+    _registry[tag] = _LazyBuilder(tag, target)
+
+
+def builders():
+    """ Return a list of ``(tag, build)`` pairs for the registered tags.
+
+    Includes the tags declared via the ``sweetpotatopie.tags`` entry point
+    group, each entry point being named for its tag, without the ``!``,
+    e.g.::
+
+        [sweetpotatopie.tags]
+        field.country = mypackage.types:Country
+
+    Entry points are enumerated once per process, but not loaded until
+    their tag is first used.
+    """
+    global _entry_points_loaded
+    if not _entry_points_loaded:
+        _entry_points_loaded = True
+        for entry_point in _iter_entry_points(ENTRY_POINT_GROUP):
+            try:
+                tag = _normalize(entry_point.name)
+            except ValueError as e:
+                warnings.warn('Ignoring entry point %r: %s'
+                              % (entry_point.name, e))
+                continue
+            if tag not in _registry:
+                _registry[tag] = _LazyBuilder(tag, entry_point)
+    return sorted(_registry.items())
+
+
+class _LazyBuilder(object):
+    """ Build the value for a tag, importing its target on first use.
+    """
+
+    def __init__(self, tag, target):
+        self.tag = tag
+        self.target = target
+        self._build = None
+
+    def __call__(self, mapping):
+        build = self._build
+        if build is None:
+            build = self._build = _make_builder(self.tag,
+                                                _resolve(self.target))
+        return build(mapping)
+
+
+def _normalize(tag):
+    tag = u(tag)
+    if not tag.startswith(u('!')):
+        tag = u('!') + tag
+    kind = tag[1:].split('.', 1)[0]
+    if kind not in _KINDS or '.' not in tag:
+        raise ValueError('tag %r must begin with one of: %s'
+                         % (tag, ', '.join(['!%s.' % x for x in _KINDS])))
+    return tag
+
+
+def _resolve(target):
+    if hasattr(target, 'load'):  # an entry point
+        return target.load()
+    if not isinstance(target, string_types):
+        return target
+    module_name, _, attrs = target.partition(':')
+    found = importlib.import_module(module_name)
+    for attr in filter(None, attrs.split('.')):
+        found = getattr(found, attr)
+    return found
+
+
+def _make_builder(tag, target):
+    from .parsers import _field
+    from .parsers import _validator
+    from .parsers import _widget
+    kind = tag[1:].split('.', 1)[0]
+    if kind == 'field':
+        return _field(target)
+    if kind == 'validator':
+        return _validator(target)
+    return _widget(target)
+
+
+def _iter_entry_points(group):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError: # pragma: no cover
+        import pkg_resources
+        return list(pkg_resources.iter_entry_points(group))
+    found = entry_points()
+    if hasattr(found, 'select'):
+        return list(found.select(group=group))
+    return list(found.get(group, ())) # pragma: no cover
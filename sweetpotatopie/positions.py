@@ -0,0 +1,131 @@
+import array
+import collections
+import weakref
+
+from yaml import YAMLError
+from yaml.constructor import ConstructorError
+from yaml.nodes import MappingNode
+from yaml.nodes import ScalarNode
+
+SourceSpan = collections.namedtuple('SourceSpan',
+                                    ['name', 'line', 'column',
+                                     'end_line', 'end_column'])
+
+
+class SchemaConstructionError(ConstructorError):
+    """ Raised when a tag's constructor fails with a non-YAML exception.
+
+    'tag_path' lists the tags (with the node names, where known) being
+    constructed, outermost first;  'original' is the exception raised.
+    The error's mark locates the innermost tag in the YAML source.
+    """
+
+    def __init__(self, tag_path, original, mark):
+        self.tag_path = tag_path
+        self.original = original
+        ConstructorError.__init__(self, None, None,
+                                  '%s: %s' % (original.__class__.__name__,
+                                              original), mark)
+        self._update_context()
+
+    def _update_context(self):
+        self.context = 'while constructing %s' % ' > '.join(self.tag_path)
+
+
+def construction_error(exc, tag, source, mark):
+    """ Return the exception to raise for 'exc', raised while constructing
+    the value for 'tag' at 'mark'.
+
+    'source' is the YAML node or the (possibly partial) mapping for the
+    value, used only to look up its name.  YAML errors, which carry their
+    own marks, are returned as they are.
+    """
+    if isinstance(exc, SchemaConstructionError):
+        exc.tag_path.insert(0, _describe(tag, source))
+        exc._update_context()
+        return exc
+    if isinstance(exc, YAMLError):
+        return exc
+    return SchemaConstructionError([_describe(tag, source)], exc, mark)
+
+
+def _describe(tag, source):
+    name = None
+    if isinstance(source, MappingNode):
+        for key, value in source.value:
+            if (isinstance(key, ScalarNode) and key.value == 'name' and
+                    isinstance(value, ScalarNode)):
+                name = value.value
+                break
+    elif isinstance(source, dict):
+        name = source.get('name')
+    if name:
+        return '%s (%s)' % (tag, name)
+    return tag
+
+
+class SourceMap(object):
+    """ Map schema nodes built by a parser back to their source spans.
+
+    Spans are held as integers in a flat array, rather than as YAML marks
+    (which each keep a reference to the whole source buffer), and nodes
+    are referenced weakly:  the slot of a node is reused once the node is
+    garbage collected, so a single map can be kept across many parses.
+    Lines and columns are one-based.
+    """
+    _WIDTH = 5  # name index, line, column, end line, end column
+
+    def __init__(self):
+        self._slots = {}  # weak reference to node -> slot
+        self._free = []
+        self._spans = array.array('l')
+        self._names = []
+        self._name_indexes = {}
+
+    def add(self, node, start_mark, end_mark):
+        """ Record the span of 'node', given the marks delimiting it.
+        """
+        name = start_mark.name
+        name_index = self._name_indexes.get(name)
+        if name_index is None:
+            name_index = self._name_indexes[name] = len(self._names)
+            self._names.append(name)
+        span = (name_index, start_mark.line, start_mark.column,
+                end_mark.line, end_mark.column)
+        slot = self._slots.get(weakref.ref(node))
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._spans)
+                self._spans.extend(span)
+            self._slots[weakref.ref(node, self._make_callback())] = slot
+        self._spans[slot:slot + self._WIDTH] = array.array('l', span)
+
+    def _make_callback(self):
+        # Free the slot of a collected node;  the callback must not keep
+        # the map itself alive.
+        map_ref = weakref.ref(self)
+
+        def _collected(ref):
+            source_map = map_ref()
+            if source_map is not None:
+                source_map._free.append(source_map._slots.pop(ref))
+        return _collected
+
+    def span(self, node):
+        """ Return the :data:`SourceSpan` of 'node'.
+
+        Raise KeyError if 'node' was not recorded.
+        """
+        slot = self._slots[weakref.ref(node)]
+        name_index, line, column, end_line, end_column = (
+            self._spans[slot:slot + self._WIDTH])
+        return SourceSpan(self._names[name_index], line + 1, column + 1,
+                          end_line + 1, end_column + 1)
+
+    def __contains__(self, node):
+        return weakref.ref(node) in self._slots
+
+    def __len__(self):
+        return len(self._slots)
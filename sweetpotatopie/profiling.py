@@ -0,0 +1,142 @@
+import collections
+import copy
+import threading
+
+import colander
+
+from ._compat import perf_counter
+
+ProfileEntry = collections.namedtuple('ProfileEntry',
+                                      ['path', 'calls', 'total', 'self'])
+
+
+class SchemaProfiler(object):
+    """ Record timings for each node and validator of 'schema'.
+
+    Calls to :meth:`deserialize` and :meth:`serialize` are timed per node
+    path (e.g. ``deserialize/schema/contacts/phone``) and per validator
+    (e.g. ``deserialize/schema/contacts/phone/!validator:Regex``),
+    accumulating the number of calls, the cumulative time, and the time
+    spent in the entry itself, excluding its children.
+
+    The schema is cloned, and the instrumentation applied only to the
+    clone:  the original schema's methods and validators are untouched.
+    The clone, 'schema', can be used in place of the original (e.g., to
+    back a form), recording timings just as :meth:`deserialize` and
+    :meth:`serialize` do.
+    """
+
+    def __init__(self, schema, timer=perf_counter):
+        self.timer = timer
+        self.schema = schema.clone()
+        self.stats = {}
+        self._local = threading.local()
+        self._instrument(self.schema)
+
+    def deserialize(self, cstruct=colander.null):
+        """ Deserialize 'cstruct' against the schema, recording timings.
+        """
+        return self.schema.deserialize(cstruct)
+
+    def serialize(self, appstruct=colander.null):
+        """ Serialize 'appstruct' against the schema, recording timings.
+        """
+        return self.schema.serialize(appstruct)
+
+    def reset(self):
+        """ Discard the timings recorded so far.
+        """
+        self.stats.clear()
+
+    def report(self, sort='total'):
+        """ Return a list of :data:`ProfileEntry` tuples.
+
+        Entries are sorted in decreasing order of 'sort', which may be
+        'total', 'self' or 'calls'.
+        """
+        entries = [ProfileEntry('/'.join(path), calls, total, own)
+                   for path, (calls, total, own) in self.stats.items()]
+        entries.sort(key=lambda x: (-getattr(x, sort), x.path))
+        return entries
+
+    def format_report(self, sort='total', limit=None):
+        """ Return the report as a text table.
+        """
+        lines = ['%8s %12s %12s  %s' % ('calls', 'total (s)', 'self (s)',
+                                         'path')]
+        for entry in self.report(sort)[:limit]:
+            lines.append('%8d %12.6f %12.6f  %s' % (entry.calls, entry.total,
+                                                     entry.self, entry.path))
+        return '\n'.join(lines)
+
+    def collapsed_stacks(self):
+        """ Return timings in the "collapsed stack" format used by
+        flamegraph tools:  one line per path, with frames separated by
+        semicolons, followed by the self time in microseconds.
+        """
+        lines = []
+        for path in sorted(self.stats):
+            own = int(round(self.stats[path][2] * 1000000))
+            if own > 0:
+                lines.append('%s %d' % (';'.join(path), own))
+        return '\n'.join(lines)
+
+    def _timed(self, segment, func, operation=None):
+        # 'operation' names the stack started by an outermost call (of a
+        # node's deserialize or serialize);  validators called on their
+        # own are not timed.
+        profiler = self
+
+        def _nested(*args, **kw):
+            timer = profiler.timer
+            state = profiler._local
+            stack = getattr(state, 'stack', None)
+            if stack is None:
+                if operation is None:
+                    return func(*args, **kw)
+                state.stack = [[(operation,), 0.0]]
+                try:
+                    return _nested(*args, **kw)
+                finally:
+                    del state.stack
+            frame = [stack[-1][0] + (segment,), 0.0]
+            stack.append(frame)
+            start = timer()
+            try:
+                return func(*args, **kw)
+            finally:
+                elapsed = timer() - start
+                stack.pop()
+                stack[-1][1] += elapsed
+                stats = profiler.stats.get(frame[0])
+                if stats is None:
+                    stats = profiler.stats[frame[0]] = [0, 0.0, 0.0]
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] += elapsed - frame[1]
+        return _nested
+
+    def _instrument(self, node):
+        segment = node.name or '<%s>' % node.typ.__class__.__name__
+        klass = node.__class__
+        node.deserialize = self._timed(segment,
+                                       klass.deserialize.__get__(node),
+                                       'deserialize')
+        node.serialize = self._timed(segment, klass.serialize.__get__(node),
+                                     'serialize')
+        validator = node.validator
+        if validator is not None and not isinstance(validator,
+                                                    colander.deferred):
+            node.validator = self._wrap_validator(validator)
+        for child in node.children:
+            self._instrument(child)
+
+    def _wrap_validator(self, validator):
+        if isinstance(validator, colander.All):
+            validator = copy.copy(validator)
+            validator.validators = tuple([self._wrap_validator(x)
+                                          for x in validator.validators])
+        name = getattr(validator, '__name__', None)
+        if name is None:
+            name = validator.__class__.__name__
+        return self._timed('!validator:%s' % name, validator)
@@ -0,0 +1,205 @@
+import importlib
+
+from yaml.constructor import ConstructorError
+from yaml.nodes import SequenceNode
+
+from ._compat import BUILTINS
+from ._compat import u
+
+_PREFIX = u('tag:yaml.org,2002:python/')
+
+_resolved = {}
+
+
+def resolve_name(name):
+    """ Import and return the object named by dotted 'name'.
+
+    Names without a dot are looked up among the builtins.  Lookups are
+    cached per process.
+    """
+    try:
+        return _resolved[name]
+    except KeyError:
+        pass
+    if '.' in name:
+        module_name, object_name = name.rsplit('.', 1)
+    else:
+        module_name, object_name = BUILTINS, name
+    module = importlib.import_module(module_name)
+    try:
+        found = getattr(module, object_name)
+    except AttributeError:
+        raise ImportError('cannot find %r in the module %r'
+                          % (object_name, module_name))
+    _resolved[name] = found
+    return found
+
+
+class NameResolver(object):
+    """ Resolve the ``!!python/*`` tags which name Python objects.
+
+    Only names listed in 'allowed' (or lying within a module or package
+    listed there) may be resolved;  if 'allowed' is None, any name may be.
+    Resolved names are cached per process (see :func:`resolve_name`).
+
+    Use :meth:`configure` to install constructors for ``!!python/name``,
+    ``!!python/module``, ``!!python/object``, ``!!python/object/apply`` and
+    ``!!python/object/new`` on a loader:  these replace the unrestricted
+    ones provided by ``yaml.Loader``, and also work with ``yaml.SafeLoader``
+    or ``yaml.CSafeLoader``.
+    """
+
+    def __init__(self, allowed=()):
+        if allowed is not None:
+            allowed = tuple(allowed)
+        self.allowed = allowed
+        self._checked = {}
+
+    def is_allowed(self, name):
+        """ Return True if 'name' is within the allow-list.
+        """
+        if self.allowed is None:
+            return True
+        try:
+            return self._checked[name]
+        except KeyError:
+            pass
+        result = False
+        for prefix in self.allowed:
+            if name == prefix or name.startswith(prefix + '.'):
+                result = True
+                break
+        self._checked[name] = result
+        return result
+
+    def resolve(self, name, mark=None):
+        """ Return the object named by 'name'.
+
+        Raise a ``yaml.constructor.ConstructorError`` if the name is not
+        allowed, or cannot be found.
+        """
+        if not name:
+            raise ConstructorError("while constructing a Python object", mark,
+                                   "expected non-empty name appended to the "
+                                   "tag", mark)
+        if not self.is_allowed(name):
+            raise ConstructorError("while constructing a Python object", mark,
+                                   "name %r is not allowed" % name, mark)
+        try:
+            return resolve_name(name)
+        except ImportError as e:
+            raise ConstructorError("while constructing a Python object", mark,
+                                   "cannot find %r (%s)" % (name, e), mark)
+
+    def configure(self, loader):
+        """ Install the constructors on 'loader' (not on its class).
+        """
+        if 'yaml_multi_constructors' not in loader.__dict__:
+            loader.yaml_multi_constructors = (
+                loader.yaml_multi_constructors.copy())
+        ctors = loader.yaml_multi_constructors
+        ctors[_PREFIX + u('name:')] = self._construct_name
+        ctors[_PREFIX + u('module:')] = self._construct_module
+        ctors[_PREFIX + u('object:')] = self._construct_object
+        ctors[_PREFIX + u('object/apply:')] = self._construct_apply
+        ctors[_PREFIX + u('object/new:')] = self._construct_new
+        return loader
+
+    def _construct_name(self, loader, suffix, node):
+        value = loader.construct_scalar(node)
+        if value:
+            raise ConstructorError("while constructing a Python name",
+                                   node.start_mark,
+                                   "expected the empty value, but found %r"
+                                   % value, node.start_mark)
+        return self.resolve(suffix, node.start_mark)
+
+    def _construct_module(self, loader, suffix, node):
+        value = loader.construct_scalar(node)
+        if value:
+            raise ConstructorError("while constructing a Python module",
+                                   node.start_mark,
+                                   "expected the empty value, but found %r"
+                                   % value, node.start_mark)
+        if not self.is_allowed(suffix):
+            raise ConstructorError("while constructing a Python module",
+                                   node.start_mark,
+                                   "module %r is not allowed" % suffix,
+                                   node.start_mark)
+        try:
+            return importlib.import_module(suffix)
+        except ImportError as e:
+            raise ConstructorError("while constructing a Python module",
+                                   node.start_mark,
+                                   "cannot find module %r (%s)" % (suffix, e),
+                                   node.start_mark)
+
+    def _construct_object(self, loader, suffix, node):
+        cls = self._find_class(suffix, node)
+        instance = cls.__new__(cls)
+        yield instance
+        deep = hasattr(instance, '__setstate__')
+        state = loader.construct_mapping(node, deep=deep)
+        _set_state(instance, state, node)
+
+    def _construct_apply(self, loader, suffix, node, newobj=False):
+        if isinstance(node, SequenceNode):
+            args = loader.construct_sequence(node, deep=True)
+            kwds, state, listitems, dictitems = {}, {}, [], {}
+        else:
+            value = loader.construct_mapping(node, deep=True)
+            args = value.get('args', [])
+            kwds = value.get('kwds', {})
+            state = value.get('state', {})
+            listitems = value.get('listitems', [])
+            dictitems = value.get('dictitems', {})
+        if newobj:
+            cls = self._find_class(suffix, node)
+            instance = cls.__new__(cls, *args, **kwds)
+        else:
+            instance = self.resolve(suffix, node.start_mark)(*args, **kwds)
+        if state:
+            _set_state(instance, state, node)
+        if listitems:
+            instance.extend(listitems)
+        for key in dictitems:
+            instance[key] = dictitems[key]
+        return instance
+
+    def _construct_new(self, loader, suffix, node):
+        return self._construct_apply(loader, suffix, node, newobj=True)
+
+    def _find_class(self, suffix, node):
+        cls = self.resolve(suffix, node.start_mark)
+        if not isinstance(cls, type):
+            raise ConstructorError("while constructing a Python instance",
+                                   node.start_mark,
+                                   "expected a class, but found %r"
+                                   % type(cls), node.start_mark)
+        return cls
+
+
+def _set_state(instance, state, node):
+    if hasattr(instance, '__setstate__'):
+        instance.__setstate__(state)
+        return
+    slotstate = {}
+    if isinstance(state, tuple) and len(state) == 2:
+        state, slotstate = state
+    if hasattr(instance, '__dict__'):
+        _check_state_keys(state, node)
+        instance.__dict__.update(state)
+    elif state:
+        slotstate.update(state)
+    _check_state_keys(slotstate, node)
+    for key, value in slotstate.items():
+        setattr(instance, key, value)
+
+
+def _check_state_keys(state, node):
+    for key in state or ():
+        if key.startswith('__'):
+            raise ConstructorError("while constructing a Python instance",
+                                   node.start_mark,
+                                   "blacklisted key %r in instance state"
+                                   % key, node.start_mark)
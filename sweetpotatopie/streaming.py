@@ -0,0 +1,278 @@
+from colander import SchemaNode
+from yaml.composer import ComposerError
+from yaml.constructor import ConstructorError
+from yaml.events import AliasEvent
+from yaml.events import MappingEndEvent
+from yaml.events import MappingStartEvent
+from yaml.events import ScalarEvent
+from yaml.events import SequenceEndEvent
+from yaml.events import SequenceStartEvent
+from yaml.events import StreamEndEvent
+from yaml.nodes import MappingNode
+from yaml.nodes import ScalarNode
+from yaml.nodes import SequenceNode
+
+from ._compat import u
+from .positions import construction_error
+
+_MAP = u('tag:yaml.org,2002:map')
+_SEQ = u('tag:yaml.org,2002:seq')
+_STR = u('tag:yaml.org,2002:str')
+_MERGE = u('tag:yaml.org,2002:merge')
+_VALUE = u('tag:yaml.org,2002:value')
+_PLACEHOLDER = u('tag:sweetpotatopie,2013:placeholder')
+
+
+class EventBuilder(object):
+    """ Construct a document directly from a loader's YAML event stream.
+
+    Plain mappings and sequences are built as dicts and lists, and mappings
+    tagged with a constructor exposing a 'build' attribute (see
+    :func:`sweetpotatopie.parsers.configure_loader`) are passed straight to
+    it, so neither the node graph nor the intermediate mappings outlive the
+    value they produce.
+
+    Scalars, and collections with any other tag (e.g. ``!!python/object``),
+    are composed into a node subtree and handed to the loader's own
+    constructors, so the result is the same as ``loader.get_single_data()``.
+
+    If the loader has a 'source_map' attribute (see
+    :class:`sweetpotatopie.positions.SourceMap`), the span of each schema
+    node built is recorded in it.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.anchors = {}
+        self._seeds = {}
+        self._end_mark = None
+
+    def get_single_data(self):
+        """ Build and return the single document in the stream.
+        """
+        loader = self.loader
+        loader.get_event()  # StreamStartEvent
+        data = None
+        start_mark = None
+        if not loader.check_event(StreamEndEvent):
+            loader.get_event()  # DocumentStartEvent
+            start_mark = loader.peek_event().start_mark
+            data = self.build_value()
+            loader.get_event()  # DocumentEndEvent
+            self.anchors = {}
+        if not loader.check_event(StreamEndEvent):
+            event = loader.get_event()
+            raise ComposerError("expected a single document in the stream",
+                                start_mark, "but found another document",
+                                event.start_mark)
+        loader.get_event()  # StreamEndEvent
+        return data
+
+    def build_value(self):
+        """ Consume the events for one value, returning the constructed value.
+        """
+        loader = self.loader
+        event = loader.peek_event()
+        if isinstance(event, AliasEvent):
+            loader.get_event()
+            if event.anchor not in self.anchors:
+                raise ComposerError(None, None, "found undefined alias %r"
+                                    % event.anchor, event.start_mark)
+            return self.anchors[event.anchor][0]
+        self._check_anchor(event)
+        if isinstance(event, MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == u('!'):
+                tag = loader.resolve(MappingNode, None, event.implicit)
+            if tag == _MAP:
+                # Register the anchor first, so the mapping may refer to
+                # itself, as it could when composed.
+                loader.get_event()
+                value = {}
+                self._define(event, value)
+                return self._build_mapping(event, value)
+            else:
+                ctor = loader.yaml_constructors.get(tag)
+                build = getattr(ctor, 'build', None)
+                if build is None:
+                    return self._construct()
+                loader.get_event()
+                mapping = {}
+                interner = getattr(loader, 'interner', None)
+                try:
+                    self._build_mapping(event, mapping)
+                    if interner is not None:
+                        mapping = interner.mapping(mapping)
+                    if getattr(build, 'takes_mark', False):
+                        value = build(mapping, event.start_mark)
+                    else:
+                        value = build(mapping)
+                except Exception as e:
+                    raise construction_error(e, tag, mapping,
+                                             event.start_mark)
+                source_map = getattr(loader, 'source_map', None)
+                if source_map is not None and isinstance(value, SchemaNode):
+                    source_map.add(value, event.start_mark, self._end_mark)
+        elif isinstance(event, SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == u('!'):
+                tag = loader.resolve(SequenceNode, None, event.implicit)
+            if tag != _SEQ:
+                return self._construct()
+            loader.get_event()
+            value = []
+            self._define(event, value)
+            while not loader.check_event(SequenceEndEvent):
+                value.append(self.build_value())
+            loader.get_event()
+            return value
+        else:
+            return self._construct()
+        self._define(event, value)
+        return value
+
+    def _define(self, event, value):
+        if event.anchor is not None:
+            self.anchors[event.anchor] = (value, event.start_mark)
+
+    def _check_anchor(self, event):
+        if event.anchor is not None and event.anchor in self.anchors:
+            raise ComposerError("found duplicate anchor %r; first occurrence"
+                                % event.anchor, self.anchors[event.anchor][1],
+                                "second occurrence", event.start_mark)
+
+    def _build_mapping(self, start_event, mapping):
+        loader = self.loader
+        merges = []
+        while not loader.check_event(MappingEndEvent):
+            key_event = loader.peek_event()
+            key_tag = None
+            if isinstance(key_event, ScalarEvent):
+                key_tag = key_event.tag
+                if key_tag is None or key_tag == u('!'):
+                    key_tag = loader.resolve(ScalarNode, key_event.value,
+                                             key_event.implicit)
+            if key_tag == _MERGE and hasattr(loader, 'flatten_mapping'):
+                loader.get_event()
+                merges.extend(self._merged(start_event))
+                continue
+            if key_tag == _VALUE and hasattr(loader, 'flatten_mapping'):
+                loader.get_event()
+                key = self._construct_scalar(key_event, _STR)
+            else:
+                key = self.build_value()
+            try:
+                hash(key)
+            except TypeError:
+                raise ConstructorError("while constructing a mapping",
+                                       start_event.start_mark,
+                                       "found unhashable key",
+                                       key_event.start_mark)
+            mapping[key] = self.build_value()
+        self._end_mark = loader.get_event().end_mark  # MappingEndEvent
+        if merges:
+            explicit = mapping.copy()
+            mapping.clear()
+            for other in merges:
+                mapping.update(other)
+            mapping.update(explicit)
+        return mapping
+
+    def _merged(self, start_event):
+        value_mark = self.loader.peek_event().start_mark
+        value = self.build_value()
+        if isinstance(value, dict):
+            return [value]
+        if isinstance(value, list):
+            for item in value:
+                if not isinstance(item, dict):
+                    raise ConstructorError("while constructing a mapping",
+                                           start_event.start_mark,
+                                           "expected a mapping for merging, "
+                                           "but found %s" % type(item),
+                                           value_mark)
+            return list(reversed(value))
+        raise ConstructorError("while constructing a mapping",
+                               start_event.start_mark,
+                               "expected a mapping or list of mappings for "
+                               "merging, but found %s" % type(value),
+                               value_mark)
+
+    def _construct_scalar(self, event, tag):
+        node = ScalarNode(tag, event.value, event.start_mark, event.end_mark,
+                          style=event.style)
+        loader = self.loader
+        try:
+            return loader.construct_object(node, deep=True)
+        finally:
+            loader.constructed_objects.pop(node, None)
+
+    def _construct(self):
+        # Compose the next value as a node subtree, and let the loader's
+        # constructors build it.
+        loader = self.loader
+        anchored = []
+        node = self._compose(anchored)
+        constructed = loader.constructed_objects
+        constructed.update(self._seeds)
+        try:
+            value = loader.construct_object(node, deep=True)
+            for anchor, each in anchored:
+                self.anchors[anchor] = (constructed[each], each.start_mark)
+        finally:
+            constructed.clear()
+            self._seeds.clear()
+        return value
+
+    def _compose(self, anchored):
+        loader = self.loader
+        event = loader.get_event()
+        if isinstance(event, AliasEvent):
+            for anchor, node in anchored:
+                if anchor == event.anchor:
+                    return node
+            if event.anchor not in self.anchors:
+                raise ComposerError(None, None, "found undefined alias %r"
+                                    % event.anchor, event.start_mark)
+            # Stand in for a value built outside this subtree.
+            node = ScalarNode(_PLACEHOLDER, u(''), event.start_mark,
+                              event.end_mark)
+            self._seeds[node] = self.anchors[event.anchor][0]
+            return node
+        self._check_anchor(event)
+        for anchor, node in anchored:
+            if anchor == event.anchor:
+                raise ComposerError("found duplicate anchor %r; "
+                                    "first occurrence" % anchor,
+                                    node.start_mark, "second occurrence",
+                                    event.start_mark)
+        tag = event.tag
+        if isinstance(event, ScalarEvent):
+            if tag is None or tag == u('!'):
+                tag = loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(tag, event.value, event.start_mark,
+                              event.end_mark, style=event.style)
+            if event.anchor is not None:
+                anchored.append((event.anchor, node))
+        elif isinstance(event, SequenceStartEvent):
+            if tag is None or tag == u('!'):
+                tag = loader.resolve(SequenceNode, None, event.implicit)
+            node = SequenceNode(tag, [], event.start_mark, None,
+                                flow_style=event.flow_style)
+            if event.anchor is not None:
+                anchored.append((event.anchor, node))
+            while not loader.check_event(SequenceEndEvent):
+                node.value.append(self._compose(anchored))
+            node.end_mark = loader.get_event().end_mark
+        else:
+            if tag is None or tag == u('!'):
+                tag = loader.resolve(MappingNode, None, event.implicit)
+            node = MappingNode(tag, [], event.start_mark, None,
+                               flow_style=event.flow_style)
+            if event.anchor is not None:
+                anchored.append((event.anchor, node))
+            while not loader.check_event(MappingEndEvent):
+                key = self._compose(anchored)
+                node.value.append((key, self._compose(anchored)))
+            node.end_mark = loader.get_event().end_mark
+        return node
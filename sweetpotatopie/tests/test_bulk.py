@@ -0,0 +1,94 @@
+import unittest
+
+SCHEMA = '\n'.join([
+    "!schema",
+    "  children:",
+    "    - !field.string",
+    "      name: name",
+    "    - !field.integer",
+    "      name: age",
+    "      validator: !validator.range",
+    "        min: 0",
+    "    - !field.integer",
+    "      name: height",
+    "      validator: !validator.range",
+    "        min: 0",
+    "",
+])
+
+
+class BulkValidatorTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.bulk import BulkValidator
+        return BulkValidator
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _records(self, count):
+        for i in range(count):
+            if i % 3 == 0:
+                yield {'name': 'n%d' % i, 'age': '-1', 'height': 'x'}
+            else:
+                yield {'name': 'n%d' % i, 'age': str(i), 'height': '180'}
+
+    def _check(self, results, count):
+        self.assertEqual([x.index for x in results], list(range(count)))
+        for result in results:
+            if result.index % 3 == 0:
+                self.failUnless(result.value is None)
+                self.assertEqual(sorted(result.errors), ['age', 'height'])
+            else:
+                self.failUnless(result.errors is None)
+                self.assertEqual(result.value['age'], result.index)
+
+    def test_ctor_requires_one_source(self):
+        self.assertRaises(ValueError, self._makeOne)
+        self.assertRaises(ValueError, self._makeOne, SCHEMA, b'')
+        self.assertRaises(ValueError, self._makeOne, SCHEMA, chunk_size=0)
+        self.assertRaises(ValueError, self._makeOne, SCHEMA, max_pending=0)
+
+    def test_in_process(self):
+        validator = self._makeOne(SCHEMA, processes=1, chunk_size=4)
+        self._check(list(validator.validate(self._records(10))), 10)
+        self.failUnless(validator._pool is None)
+
+    def test_max_errors(self):
+        validator = self._makeOne(SCHEMA, processes=1, max_errors=1)
+        result = list(validator.validate(self._records(1)))[0]
+        self.assertEqual(list(result.errors), ['age'])
+
+    def test_schema_errors_raised_in_caller(self):
+        validator = self._makeOne('!schema\n  children: [\n', processes=2)
+        self.assertRaises(Exception, list, validator.validate([{}]))
+        self.failUnless(validator._pool is None)
+
+    def test_worker_processes(self):
+        with self._makeOne(SCHEMA, processes=2, chunk_size=3,
+                           max_pending=2) as validator:
+            self._check(list(validator(self._records(20))), 20)
+            self._check(list(validator(self._records(5))), 5)
+            self.failIf(validator._pool is None)
+            self.failUnless(validator._local is None)
+        self.failUnless(validator._pool is None)
+
+    def test_compiled(self):
+        from sweetpotatopie import compiled
+        from sweetpotatopie.parsers import SchemaParser
+        data = compiled.dumps(SchemaParser()(SCHEMA), SCHEMA)
+        with self._makeOne(compiled=data, processes=2) as validator:
+            self._check(list(validator(self._records(7))), 7)
+
+    def test_reads_records_lazily(self):
+        consumed = []
+
+        def _records():
+            for record in self._records(100):
+                consumed.append(record)
+                yield record
+
+        validator = self._makeOne(SCHEMA, processes=1, chunk_size=10)
+        results = validator.validate(_records())
+        next(results)
+        self.assertEqual(len(consumed), 10)
@@ -0,0 +1,96 @@
+import unittest
+
+
+class ChoicesTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.choices import Choices
+        return Choices
+
+    def _makeOne(self, items=()):
+        return self._getTargetClass()(items)
+
+    def test_preserves_order(self):
+        choices = self._makeOne(['red', 'blue', 'green'])
+        self.assertEqual(list(choices), ['red', 'blue', 'green'])
+        self.assertEqual(choices[1], 'blue')
+        self.assertEqual(len(choices), 3)
+
+    def test_contains_hashable(self):
+        choices = self._makeOne(['red', 'blue', 1])
+        self.assertTrue('red' in choices)
+        self.assertTrue(1.0 in choices)
+        self.assertFalse('purple' in choices)
+
+    def test_contains_unhashable_choice(self):
+        choices = self._makeOne(['red', [1, 2]])
+        self.assertTrue([1, 2] in choices)
+        self.assertFalse([2, 1] in choices)
+
+    def test_contains_unhashable_value(self):
+        choices = self._makeOne(['red', 'blue'])
+        self.assertFalse({} in choices)
+
+    def test_pickle_roundtrip(self):
+        import pickle
+        choices = self._makeOne(['red', 'blue'])
+        restored = pickle.loads(pickle.dumps(choices))
+        self.assertEqual(restored, choices)
+        self.assertTrue('blue' in restored)
+        self.assertTrue(isinstance(restored, self._getTargetClass()))
+
+    def test_w_colander_OneOf(self):
+        import colander
+        validator = colander.OneOf(self._makeOne(['red', 'blue']))
+        validator(None, 'red')
+        self.assertRaises(colander.Invalid, validator, None, 'green')
+
+
+class Test_load_choices(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        from sweetpotatopie.choices import _loaded
+        _loaded.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def _callFUT(self, path):
+        from sweetpotatopie.choices import load_choices
+        return load_choices(path)
+
+    def _writeFile(self, name, text):
+        import os
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_text_file(self):
+        path = self._writeFile('colors.txt', 'red\n\nblue  \ngreen\n')
+        choices = self._callFUT(path)
+        self.assertEqual(list(choices), ['red', 'blue', 'green'])
+        self.assertTrue('blue' in choices)
+
+    def test_yaml_file(self):
+        path = self._writeFile('numbers.yaml', '- 1\n- 2\n- 3\n')
+        self.assertEqual(list(self._callFUT(path)), [1, 2, 3])
+
+    def test_yaml_file_not_a_sequence(self):
+        path = self._writeFile('bogus.yml', 'foo: bar\n')
+        self.assertRaises(ValueError, self._callFUT, path)
+
+    def test_cached_across_calls(self):
+        path = self._writeFile('colors.txt', 'red\nblue\n')
+        self.assertTrue(self._callFUT(path) is self._callFUT(path))
+
+    def test_reloaded_when_file_changes(self):
+        path = self._writeFile('colors.txt', 'red\nblue\n')
+        first = self._callFUT(path)
+        self._writeFile('colors.txt', 'red\nblue\ngreen\n')
+        second = self._callFUT(path)
+        self.assertFalse(first is second)
+        self.assertEqual(list(second), ['red', 'blue', 'green'])
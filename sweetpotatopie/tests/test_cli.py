@@ -0,0 +1,252 @@
+import unittest
+
+GOOD = '\n'.join([
+    "!schema",
+    "  children:",
+    "    - !field.string",
+    "      name: first_name",
+    "    - !field.integer",
+    "      name: age",
+    "",
+])
+
+BAD = '\n'.join([
+    "!schema",
+    "  children:",
+    "    - !field.string",
+    "      name: first_name",
+    "    - !field.integer",
+    "      name: age",
+    "      validator: !!python/name:os.system",
+    "",
+])
+
+
+class _TempDir(object):
+
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def _writeFile(self, name, text):
+        import os
+        path = os.path.join(self.tmpdir, name)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def _callFUT(self, *argv):
+        from sweetpotatopie._compat import StringIO
+        from sweetpotatopie.cli import main
+        out = StringIO()
+        status = main(list(argv), out)
+        return status, out.getvalue()
+
+
+class ArgumentTests(unittest.TestCase):
+
+    def _callFUT(self, *argv):
+        import sys
+        from sweetpotatopie._compat import StringIO
+        from sweetpotatopie.cli import main
+        err = StringIO()
+        saved, sys.stderr = sys.stderr, err
+        try:
+            main(list(argv), StringIO())
+        except SystemExit as e:
+            return e.code, err.getvalue()
+        finally:
+            sys.stderr = saved
+        self.fail('SystemExit not raised')
+
+    def test_repeat_at_least_one(self):
+        status, error = self._callFUT('bench', '-n', '0', 'a.yaml')
+        self.assertEqual(status, 2)
+        self.failUnless('argument -n/--repeat: must be an integer of at '
+                        'least 1' in error)
+
+    def test_jobs_not_negative(self):
+        status, error = self._callFUT('check', '-j', '-1', 'a.yaml')
+        self.assertEqual(status, 2)
+        self.failUnless('argument -j/--jobs: must be an integer of at '
+                        'least 0' in error)
+
+    def test_jobs_not_integer(self):
+        status, error = self._callFUT('check', '-j', 'many', 'a.yaml')
+        self.assertEqual(status, 2)
+        self.failUnless('argument -j/--jobs:' in error)
+
+
+class Test_find_schemas(_TempDir, unittest.TestCase):
+
+    def test_expands_directories(self):
+        from sweetpotatopie.cli import find_schemas
+        a = self._writeFile('a.yaml', GOOD)
+        b = self._writeFile('sub/b.yml', GOOD)
+        self._writeFile('sub/notes.txt', '')
+        other = self._writeFile('other.txt', GOOD)
+        self.assertEqual(find_schemas([self.tmpdir, other]), [a, b, other])
+
+
+class CheckTests(_TempDir, unittest.TestCase):
+
+    def test_all_good(self):
+        self._writeFile('a.yaml', GOOD)
+        self._writeFile('b.yaml', GOOD)
+        status, output = self._callFUT('check', self.tmpdir)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, '2 file(s) checked, 0 error(s)\n')
+
+    def test_w_yaml_error(self):
+        path = self._writeFile('a.yaml', GOOD + '  - [\n')
+        status, output = self._callFUT('check', path)
+        self.assertEqual(status, 1)
+        first = output.splitlines()[0]
+        self.failUnless(first.startswith(path + ':'))
+        line, column = first[len(path) + 1:].split(':')[:2]
+        self.assertEqual(int(line), 7)
+
+    def test_safe_w_disallowed_name(self):
+        path = self._writeFile('a.yaml', BAD)
+        status, output = self._callFUT('check', '--safe', path)
+        self.assertEqual(status, 1)
+        self.failUnless(output.startswith('%s:7:18: ' % path))
+        self.failUnless("'os.system' is not allowed" in output)
+
+    def test_json_output(self):
+        import json
+        path = self._writeFile('a.yaml', BAD)
+        status, output = self._callFUT('check', '--format', 'json',
+                                       '--allow', 'colander', path)
+        self.assertEqual(status, 1)
+        results = json.loads(output)['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertEqual(results[0]['line'], 7)
+        self.assertEqual(results[0]['column'], 18)
+
+    def test_relative_choices_file(self):
+        from sweetpotatopie.choices import _loaded
+        self._writeFile('sub/colors.txt', 'red\nblue\n')
+        path = self._writeFile('sub/a.yaml', '\n'.join([
+            "!field.string",
+            "  name : color",
+            "  validator : !validator.one_of",
+            "    choices_file : colors.txt",
+        ]))
+        try:
+            status, output = self._callFUT('check', path)
+        finally:
+            _loaded.clear()
+        self.assertEqual(status, 0)
+
+    def test_parallel(self):
+        self._writeFile('a.yaml', GOOD)
+        self._writeFile('b.yaml', GOOD)
+        self._writeFile('c.yaml', GOOD)
+        status, output = self._callFUT('check', '--jobs', '2', self.tmpdir)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, '3 file(s) checked, 0 error(s)\n')
+
+
+class CompileTests(_TempDir, unittest.TestCase):
+
+    def test_compile_and_reuse(self):
+        import os
+        from sweetpotatopie import compiled
+        source = os.path.join(self.tmpdir, 'src')
+        output = os.path.join(self.tmpdir, 'out')
+        self._writeFile('src/a.yaml', GOOD)
+        self._writeFile('src/sub/b.yaml', GOOD)
+        status, text = self._callFUT('compile', source, '-o', output)
+        self.assertEqual(status, 0)
+        self.failUnless(text.endswith('2 compiled, 0 up to date, 0 error(s)\n'))
+        artifact = os.path.join(output, 'sub', 'b.yaml.pickle')
+        with open(artifact, 'rb') as f:
+            schema = compiled.loads(f.read())
+        self.assertEqual([x.name for x in schema.children],
+                         ['first_name', 'age'])
+        status, text = self._callFUT('compile', source, '-o', output)
+        self.failUnless(text.endswith('0 compiled, 2 up to date, 0 error(s)\n'))
+        status, text = self._callFUT('compile', source, '-o', output,
+                                     '--force')
+        self.failUnless(text.endswith('2 compiled, 0 up to date, 0 error(s)\n'))
+
+    def test_extensions_do_not_collide(self):
+        import os
+        self._writeFile('a.yaml', GOOD)
+        self._writeFile('a.yml', GOOD)
+        status, text = self._callFUT('compile', self.tmpdir)
+        self.failUnless(text.endswith('2 compiled, 0 up to date, 0 error(s)\n'))
+        self.failUnless(os.path.exists(
+            os.path.join(self.tmpdir, 'a.yaml.pickle')))
+        self.failUnless(os.path.exists(
+            os.path.join(self.tmpdir, 'a.yml.pickle')))
+
+    def test_recompiles_changed_source(self):
+        path = self._writeFile('a.yaml', GOOD)
+        self._callFUT('compile', self.tmpdir)
+        self._writeFile('a.yaml', GOOD.replace('age', 'years'))
+        status, text = self._callFUT('compile', self.tmpdir)
+        self.failUnless(text.endswith('1 compiled, 0 up to date, 0 error(s)\n'))
+
+    def test_recompiles_changed_options(self):
+        self._writeFile('a.yaml', GOOD)
+        self._callFUT('compile', self.tmpdir)
+        status, text = self._callFUT('compile', '--streaming', self.tmpdir)
+        self.failUnless(text.endswith('1 compiled, 0 up to date, 0 error(s)\n'))
+        status, text = self._callFUT('compile', '--streaming', self.tmpdir)
+        self.failUnless(text.endswith('0 compiled, 1 up to date, 0 error(s)\n'))
+
+    def test_recompiles_unreadable_artifact(self):
+        import os
+        self._writeFile('a.yaml', GOOD)
+        self._callFUT('compile', self.tmpdir)
+        artifact = os.path.join(self.tmpdir, 'a.yaml.pickle')
+        with open(artifact, 'rb') as f:
+            data = f.read()
+        with open(artifact, 'wb') as f:
+            f.write(data[:5])
+        status, text = self._callFUT('compile', self.tmpdir)
+        self.assertEqual(status, 0)
+        self.failUnless(text.endswith('1 compiled, 0 up to date, 0 error(s)\n'))
+
+    def test_w_error(self):
+        self._writeFile('a.yaml', BAD)
+        status, text = self._callFUT('compile', '--safe', self.tmpdir)
+        self.assertEqual(status, 1)
+
+
+class BenchTests(_TempDir, unittest.TestCase):
+
+    def test_parse_only(self):
+        import json
+        path = self._writeFile('a.yaml', GOOD)
+        status, output = self._callFUT('bench', '-n', '2', '--format', 'json',
+                                       path)
+        self.assertEqual(status, 0)
+        result = json.loads(output)['results'][0]
+        self.assertEqual(result['repeat'], 2)
+        self.failUnless(result['parse']['min'] <= result['parse']['max'])
+        self.failIf('deserialize' in result)
+
+    def test_w_data(self):
+        path = self._writeFile('a.yaml', GOOD)
+        data = self._writeFile('data.json',
+                               '[{"first_name": "a", "age": "1"},'
+                               ' {"first_name": "b", "age": "x"}]')
+        status, output = self._callFUT('bench', '-n', '2', '--data', data,
+                                       path)
+        self.assertEqual(status, 0)
+        lines = output.splitlines()
+        self.assertEqual(lines[0], path)
+        self.failUnless(lines[1].strip().startswith('parse:'))
+        self.failUnless('(2 samples, 1 invalid' in lines[2])
+
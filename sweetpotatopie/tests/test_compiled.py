@@ -0,0 +1,56 @@
+import unittest
+
+TEXT = '\n'.join([
+    "!schema",
+    "  children:",
+    "    - !field.string",
+    "      name: first_name",
+    "    - !field.integer",
+    "      name: age",
+])
+
+
+class Test_dumps_loads(unittest.TestCase):
+
+    def _makeSchema(self):
+        from sweetpotatopie.parsers import SchemaParser
+        return SchemaParser()(TEXT)
+
+    def test_roundtrip(self):
+        from sweetpotatopie import compiled
+        data = compiled.dumps(self._makeSchema(), TEXT)
+        self.assertEqual(compiled.source_digest(data), compiled.digest(TEXT))
+        schema = compiled.loads(data, TEXT)
+        self.assertEqual([x.name for x in schema.children],
+                         ['first_name', 'age'])
+
+    def test_loads_wo_text(self):
+        from sweetpotatopie import compiled
+        data = compiled.dumps(self._makeSchema(), TEXT)
+        self.assertEqual(len(compiled.loads(data).children), 2)
+
+    def test_loads_stale(self):
+        from sweetpotatopie import compiled
+        data = compiled.dumps(self._makeSchema(), TEXT)
+        self.assertRaises(ValueError, compiled.loads, data, TEXT + '\n')
+
+    def test_loads_unsupported_version(self):
+        import pickle
+        from sweetpotatopie import compiled
+        data = pickle.dumps((compiled.FORMAT_VERSION + 1, 'abc'))
+        self.assertRaises(ValueError, compiled.loads, data)
+        self.assertRaises(ValueError, compiled.source_digest, data)
+
+    def test_loads_w_options(self):
+        from sweetpotatopie import compiled
+        options = {'streaming': True, 'allow': ['colander']}
+        data = compiled.dumps(self._makeSchema(), TEXT, options)
+        self.assertEqual(len(compiled.loads(data, TEXT, options).children), 2)
+        self.assertRaises(ValueError, compiled.loads, data, TEXT)
+        self.assertRaises(ValueError, compiled.loads, data, TEXT,
+                          {'streaming': False, 'allow': ['colander']})
+
+    def test_digest_bytes_and_text(self):
+        from sweetpotatopie import compiled
+        self.assertEqual(compiled.digest(TEXT),
+                         compiled.digest(TEXT.encode('utf-8')))
@@ -0,0 +1,156 @@
+import unittest
+
+V1 = '\n'.join([
+    "!schema",
+    "  name: person",
+    "  children:",
+    "    - !field.string",
+    "      name: first_name",
+    "      validator: !validator.length {max: 20}",
+    "    - !field.sequence",
+    "      name: phones",
+    "      children:",
+    "        - !field.string",
+    "          name: phone",
+    "    - !field.mapping",
+    "      name: address",
+    "      children:",
+    "        - !field.string",
+    "          name: street",
+    "        - !field.string",
+    "          name: city",
+    "",
+])
+
+# 'first_name' changes, 'city' moves, 'zip' is added, 'phones' removed.
+V2 = '\n'.join([
+    "!schema",
+    "  name: person",
+    "  children:",
+    "    - !field.string",
+    "      validator: !validator.length {max: 40}",
+    "      name: first_name",
+    "    - !field.mapping",
+    "      name: address",
+    "      children:",
+    "        - !field.string",
+    "          name: city",
+    "        - !field.string",
+    "          name: street",
+    "        - !field.string",
+    "          name: zip",
+    "",
+])
+
+
+class Test_diff(unittest.TestCase):
+
+    def _callFUT(self, old_text, new_text):
+        from sweetpotatopie.diff import diff
+        return diff(old_text, new_text)
+
+    def test_same(self):
+        result = self._callFUT(V1, V1)
+        self.failIf(result)
+        self.assertEqual((result.added, result.removed, result.changed),
+                         ([], [], []))
+
+    def test_layout_only(self):
+        reformatted = V1.replace(
+            "      validator: !validator.length {max: 20}",
+            "      validator: !validator.length\n        max: 20")
+        self.failIf(self._callFUT(V1, reformatted))
+
+    def test_changes(self):
+        result = self._callFUT(V1, V2)
+        self.failUnless(result)
+        self.assertEqual(result.added, ['person.address.zip'])
+        self.assertEqual(result.removed, ['person.phones',
+                                          'person.phones.phone'])
+        self.assertEqual(result.changed, ['person.first_name'])
+        self.assertEqual(result.affected, [
+            'person', 'person.first_name', 'person.address',
+            'person.address.zip', 'person.phones', 'person.phones.phone'])
+
+    def test_unnamed_and_duplicate_names(self):
+        from sweetpotatopie.diff import _segments
+        self.assertEqual(_segments(['a', None, 'b', 'a', '']),
+                         ['a', '[1]', 'b', 'a[3]', '[4]'])
+
+    def test_recursive_alias(self):
+        text = '\n'.join([
+            "!schema",
+            "  extra: &loop [*loop]",
+            "",
+        ])
+        self.failIf(self._callFUT(text, text))
+
+
+class IncrementalParserTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.diff import IncrementalParser
+        return IncrementalParser
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _byPath(self, schema):
+        found = {}
+
+        def _walk(node, path):
+            found[path] = node
+            for child in node.children:
+                _walk(child, '%s.%s' % (path, child.name))
+
+        _walk(schema, schema.name)
+        return found
+
+    def test_first_version(self):
+        parser = self._makeOne()
+        schema = parser(V1)
+        self.failUnless(parser.schema is schema)
+        self.assertEqual(parser.diff.added[0], 'person')
+        self.assertEqual(parser.diff.affected, parser.diff.added)
+        self.assertEqual([x.name for x in schema.children],
+                         ['first_name', 'phones', 'address'])
+
+    def test_unchanged(self):
+        parser = self._makeOne()
+        first = parser(V1)
+        self.failUnless(parser(V1) is first)
+        self.failIf(parser.diff)
+
+    def test_reuses_unchanged_subtrees(self):
+        from sweetpotatopie.parsers import SchemaParser
+        parser = self._makeOne()
+        old = self._byPath(parser(V1))
+        new = self._byPath(parser(V2))
+        self.failIf(new['person'] is old['person'])
+        self.failIf(new['person.first_name'] is old['person.first_name'])
+        self.assertEqual(new['person.first_name'].validator.max, 40)
+        self.failIf(new['person.address'] is old['person.address'])
+        self.failUnless(new['person.address.city'] is
+                        old['person.address.city'])
+        self.failUnless(new['person.address.street'] is
+                        old['person.address.street'])
+        for path, node in new.items():
+            self.assertEqual(node is old.get(path),
+                             path not in parser.diff.affected)
+        fresh = SchemaParser()(V2)
+        self.assertEqual([x.name for x in new['person'].children],
+                         [x.name for x in fresh.children])
+        self.assertEqual(new['person'].deserialize(
+            {'first_name': 'a', 'address': {'city': 'b', 'street': 'c',
+                                            'zip': 'd'}}),
+            fresh.deserialize({'first_name': 'a',
+                               'address': {'city': 'b', 'street': 'c',
+                                           'zip': 'd'}}))
+
+    def test_w_parser(self):
+        from sweetpotatopie.parsers import SchemaParser
+        parser = self._makeOne(SchemaParser(streaming=True, intern=True))
+        first = self._byPath(parser(V1))
+        second = self._byPath(parser(V1.replace('max: 20', 'max: 30')))
+        self.failUnless(second['person.phones'] is first['person.phones'])
+        self.assertEqual(parser.diff.changed, ['person.first_name'])
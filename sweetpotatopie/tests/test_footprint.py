@@ -0,0 +1,84 @@
+import unittest
+
+SCHEMA = '\n'.join([
+    "!schema",
+    "  name: person",
+    "  children:",
+    "    - !field.string",
+    "      name: first_name",
+    "      title: Name",
+    "      description: The name the person goes by.",
+    "    - !field.string",
+    "      name: last_name",
+    "      title: Name",
+    "      description: The name the person goes by.",
+    "    - !field.sequence",
+    "      name: phones",
+    "      children:",
+    "        - !field.string",
+    "          name: phone",
+    "          validator: !validator.length",
+    "            max: 20",
+    "",
+])
+
+
+class Test_measure(unittest.TestCase):
+
+    def _callFUT(self, schema):
+        from sweetpotatopie.footprint import measure
+        return measure(schema)
+
+    def _parse(self, **kw):
+        from sweetpotatopie.parsers import SchemaParser
+        return SchemaParser(**kw)(SCHEMA)
+
+    def test_breakdowns_sum_to_total(self):
+        footprint = self._callFUT(self._parse())
+        self.failUnless(footprint.total > 0)
+        for sizes in (footprint.by_category, footprint.by_type,
+                      footprint.by_tag):
+            self.assertEqual(sum(sizes.values()), footprint.total)
+        self.assertEqual(footprint.by_path['person'], footprint.total)
+
+    def test_keys(self):
+        footprint = self._callFUT(self._parse())
+        self.assertEqual(sorted(footprint.by_tag),
+                         ['!field.sequence', '!field.string', '!schema'])
+        self.assertEqual(sorted(footprint.by_type),
+                         ['Mapping', 'Sequence', 'String'])
+        self.assertEqual(sorted(footprint.by_path),
+                         ['person', 'person.first_name', 'person.last_name',
+                          'person.phones', 'person.phones.phone'])
+        self.failUnless(footprint.by_category['validators'] > 0)
+        self.failUnless(footprint.by_category['strings'] > 0)
+        self.failUnless(footprint.by_path['person.phones'] >
+                        footprint.by_path['person.phones.phone'])
+
+    def test_shared_objects_counted_once(self):
+        import colander
+        typ = colander.String()
+        schema = colander.SchemaNode(
+            colander.Mapping(),
+            colander.SchemaNode(typ, name='a'),
+            colander.SchemaNode(typ, name='b'))
+        footprint = self._callFUT(schema)
+        a = footprint.by_path['<Mapping>.a']
+        b = footprint.by_path['<Mapping>.b']
+        self.failUnless(a > b)
+
+    def test_interning_shrinks_footprint(self):
+        plain = self._callFUT(self._parse())
+        interned = self._callFUT(self._parse(intern=True))
+        self.failUnless(interned.total < plain.total)
+        self.failUnless(interned.by_category['strings'] <
+                        plain.by_category['strings'])
+
+    def test_format(self):
+        footprint = self._callFUT(self._parse())
+        text = footprint.format(limit=1)
+        lines = text.splitlines()
+        self.assertEqual(lines[0], 'total: %d bytes' % footprint.total)
+        self.assertEqual(lines[1], 'by category:')
+        self.assertEqual(lines[3], 'by type:')
+        self.failUnless(lines[-1].endswith('  person'))
@@ -0,0 +1,35 @@
+import unittest
+
+
+class InternerTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.interning import Interner
+        return Interner
+
+    def _makeOne(self):
+        return self._getTargetClass()()
+
+    def test_string(self):
+        interner = self._makeOne()
+        first = ''.join(['ti', 'tle'])
+        second = ''.join(['tit', 'le'])
+        self.failIf(first is second)
+        self.failUnless(interner.string(first) is interner.string(second))
+
+    def test_mapping(self):
+        interner = self._makeOne()
+        value = ''.join(['Na', 'me'])
+        mapping = {'title': value, 'missing': 3}
+        result = interner.mapping(mapping)
+        self.assertEqual(result, mapping)
+        self.failIf(result is mapping)
+        self.failUnless(result['title'] is interner.string('Name'))
+
+    def test_mapping_w_type_args(self):
+        interner = self._makeOne()
+        type_args = {'encoding': ''.join(['ut', 'f-8'])}
+        result = interner.mapping({'type_args': type_args})
+        self.assertEqual(result['type_args'], type_args)
+        self.failUnless(result['type_args']['encoding'] is
+                        interner.string('utf-8'))
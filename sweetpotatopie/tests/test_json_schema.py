@@ -0,0 +1,292 @@
+import unittest
+
+PERSON = '\n'.join([
+    "!schema",
+    "  name: person",
+    "  children:",
+    "    - !field.string",
+    "      name: first_name",
+    "      validator: !validator.all",
+    "        validators:",
+    "          - !validator.length {min: 1, max: 20}",
+    "          - !validator.regex {regex: '[A-Z]'}",
+    "    - !field.integer",
+    "      name: age",
+    "      missing: 0",
+    "      validator: !validator.range {min: 0, max: 150}",
+    "    - !field.string",
+    "      name: color",
+    "      validator: !validator.one_of {choices: [red, blue]}",
+    "    - !field.sequence",
+    "      name: phones",
+    "      validator: !validator.length {max: 3}",
+    "      children:",
+    "        - !field.string",
+    "          name: phone",
+    "          validator: !validator.function",
+    "            function: !!python/name:builtins.callable",
+    "",
+])
+
+
+class Test_to_json_schema(unittest.TestCase):
+
+    def _callFUT(self, schema, strict=False):
+        from sweetpotatopie.json_schema import to_json_schema
+        return to_json_schema(schema, strict)
+
+    def _parse(self, text):
+        from sweetpotatopie.parsers import SchemaParser
+        return SchemaParser()(text)
+
+    def _node(self, typ, *children, **kw):
+        import colander
+        return colander.SchemaNode(typ, *children, **kw)
+
+    def test_tagged_schema(self):
+        from sweetpotatopie.json_schema import DRAFT
+        from sweetpotatopie.json_schema import UNCHECKED
+        document = self._callFUT(self._parse(PERSON))
+        self.assertEqual(document['$schema'], DRAFT)
+        self.assertEqual(document['type'], 'object')
+        self.assertEqual(document['required'],
+                         ['first_name', 'color', 'phones'])
+        properties = document['properties']
+        self.assertEqual(list(properties),
+                         ['first_name', 'age', 'color', 'phones'])
+        self.assertEqual(properties['first_name'], {
+            'title': 'First Name',
+            'type': 'string',
+            'minLength': 1,
+            'maxLength': 20,
+            'pattern': '^(?:[A-Z])',
+        })
+        self.assertEqual(properties['age']['anyOf'], [
+            {'enum': [None, '']},
+            {},
+        ])
+        self.assertEqual(properties['age'][UNCHECKED],
+                         ['!field.integer', '!validator.range'])
+        self.assertEqual(properties['color']['enum'], ['red', 'blue'])
+        phones = properties['phones']
+        self.assertEqual(phones['type'], 'array')
+        self.assertEqual(phones['maxItems'], 3)
+        self.assertEqual(phones['items'][UNCHECKED], ['!validator.function'])
+        self.assertEqual(phones['items']['type'], 'string')
+
+    def test_tagged_schema_strict(self):
+        document = self._callFUT(self._parse(PERSON), strict=True)
+        self.assertEqual(document['properties']['age']['anyOf'], [
+            {'enum': [None, '']},
+            {'type': 'integer', 'minimum': 0, 'maximum': 150},
+        ])
+
+    def test_scalar_types_strict(self):
+        import colander
+        for typ, expected in [
+                (colander.Float(), {'type': 'number'}),
+                (colander.Boolean(), {'type': 'boolean'}),
+                ]:
+            self.assertEqual(self._callFUT(self._node(typ), strict=True),
+                             dict(expected, **{'$schema': self._draft()}))
+
+    def test_numbers_and_booleans_given_as_strings(self):
+        # Colander accepts "42" as an integer and "true" as a boolean:  so
+        # must the document, which leaves their JSON type unchecked.
+        import colander
+        from sweetpotatopie.json_schema import UNCHECKED
+        schema = self._parse('\n'.join([
+            "!schema",
+            "  children:",
+            "    - !field.integer",
+            "      name: count",
+            "    - !field.boolean",
+            "      name: flag",
+            "",
+        ]))
+        self.assertEqual(schema.deserialize({'count': '42', 'flag': 'true'}),
+                         {'count': 42, 'flag': True})
+        properties = self._callFUT(schema)['properties']
+        self.assertEqual(properties['count'], {'title': 'Count',
+                                               UNCHECKED: ['!field.integer']})
+        self.assertEqual(properties['flag'], {'title': 'Flag',
+                                              UNCHECKED: ['!field.boolean']})
+        schema['count'].typ = colander.Float()
+        schema['count'].validator = colander.Range(min=0, max=10)
+        count = self._callFUT(schema)['properties']['count']
+        # JSON Schema applies the bounds to numbers only.
+        self.failIf('type' in count)
+        self.assertEqual((count['minimum'], count['maximum']), (0, 10))
+
+    def test_coerced_constraints_unchecked(self):
+        # Integer(4.7) is 4, and "1" is one of [1, 2].
+        import colander
+        from sweetpotatopie.json_schema import UNCHECKED
+        for typ, validator, expected in [
+                (colander.Integer(), colander.Range(max=4),
+                 ['!field.integer', '!validator.range']),
+                (colander.Decimal('0.1'), colander.Range(max=4),
+                 ['!field.decimal', '!validator.range']),
+                (colander.Integer(), colander.OneOf([1, 2]),
+                 ['!field.integer', '!validator.one_of']),
+                ]:
+            document = self._callFUT(self._node(typ, validator=validator))
+            self.failIf('maximum' in document)
+            self.failIf('enum' in document)
+            self.assertEqual(document[UNCHECKED], expected)
+            document = self._callFUT(self._node(typ, validator=validator),
+                                     strict=True)
+            self.failIf(UNCHECKED in document)
+
+    def test_email_pattern_only(self):
+        import colander
+        document = self._callFUT(self._node(colander.String(),
+                                            validator=colander.Email()))
+        self.failUnless('pattern' in document)
+        self.failIf('format' in document)
+
+    def test_dates_and_times_unchecked(self):
+        # Colander accepts values which the JSON Schema 'date-time' and
+        # 'time' formats (RFC 3339) reject:  no format is exported.
+        from sweetpotatopie.json_schema import UNCHECKED
+        schema = self._parse('\n'.join([
+            "!schema",
+            "  children:",
+            "    - !field.time",
+            "      name: t",
+            "    - !field.datetime",
+            "      name: dt",
+            "    - !field.date",
+            "      name: d",
+            "",
+        ]))
+        schema.deserialize({'t': '10:00', 'dt': '2013-04-12',
+                            'd': '2013-04-12'})
+        properties = self._callFUT(schema)['properties']
+        for name, tag in [('t', '!field.time'), ('dt', '!field.datetime'),
+                          ('d', '!field.date')]:
+            self.assertEqual(properties[name]['type'], 'string')
+            self.failIf('format' in properties[name])
+            self.assertEqual(properties[name][UNCHECKED], [tag])
+
+    def test_optional_string_allowing_empty(self):
+        import colander
+        node = self._node(colander.String(allow_empty=True), missing='')
+        document = self._callFUT(node)
+        self.assertEqual(document['anyOf'][0], {'enum': [None]})
+
+    def test_tuple_and_unknown_raise(self):
+        import colander
+        schema = self._node(
+            colander.Mapping(unknown='raise'),
+            self._node(colander.Tuple(),
+                       self._node(colander.Integer(), name='x'),
+                       self._node(colander.Integer(), name='y'),
+                       name='point'))
+        document = self._callFUT(schema, strict=True)
+        self.assertEqual(document['additionalProperties'], False)
+        point = document['properties']['point']
+        self.assertEqual(point['items'], [{'title': 'X', 'type': 'integer'},
+                                          {'title': 'Y', 'type': 'integer'}])
+        self.assertEqual((point['minItems'], point['maxItems']), (2, 2))
+
+    def test_clashing_constraints_use_allOf(self):
+        import colander
+        validator = colander.All(colander.Length(max=10),
+                                 colander.Length(max=5))
+        document = self._callFUT(self._node(colander.String(),
+                                            validator=validator))
+        self.assertEqual(document['maxLength'], 10)
+        self.assertEqual(document['allOf'], [{'maxLength': 5}])
+
+    def test_unexpressible_constraints(self):
+        import re
+        import colander
+        from sweetpotatopie.json_schema import UNCHECKED
+
+        def _check(node, value):
+            pass
+
+        for typ, validator, expected in [
+                (colander.String(), _check, '_check'),
+                (colander.String(), colander.Range(min='a'),
+                 '!validator.range'),
+                (colander.Decimal(), colander.Range(min=_decimal('0.5')),
+                 '!validator.range'),
+                (colander.String(), colander.Regex('(?P<x>a)'),
+                 '!validator.regex'),
+                (colander.String(), colander.Regex('a', flags=re.I),
+                 '!validator.regex'),
+                (colander.Integer(), colander.OneOf([_date()]),
+                 '!validator.one_of'),
+                (colander.Mapping(), colander.Length(max=2),
+                 '!validator.length'),
+                ]:
+            document = self._callFUT(self._node(typ, validator=validator),
+                                     strict=True)
+            self.assertEqual(document[UNCHECKED], [expected])
+
+    def test_validator_w_preparer(self):
+        import colander
+        from sweetpotatopie.json_schema import UNCHECKED
+        node = self._node(colander.String(), preparer=lambda x: x.strip(),
+                          validator=colander.Length(max=3))
+        document = self._callFUT(node)
+        self.failIf('maxLength' in document)
+        self.assertEqual(document[UNCHECKED], ['!validator.length'])
+
+    def test_unknown_type(self):
+        import colander
+        from sweetpotatopie.json_schema import UNCHECKED
+
+        class Color(colander.String):
+            pass
+
+        document = self._callFUT(self._node(Color()))
+        self.failIf('type' in document)
+        self.assertEqual(document[UNCHECKED], ['Color'])
+
+    def test_json_serializable(self):
+        import json
+        document = self._callFUT(self._parse(PERSON))
+        self.assertEqual(json.loads(json.dumps(document)), document)
+
+    def _draft(self):
+        from sweetpotatopie.json_schema import DRAFT
+        return DRAFT
+
+
+class Test_find_unchecked(unittest.TestCase):
+
+    def _callFUT(self, document):
+        from sweetpotatopie.json_schema import find_unchecked
+        return find_unchecked(document)
+
+    def test_none(self):
+        self.assertEqual(self._callFUT({'type': 'string'}), [])
+
+    def test_nested(self):
+        from sweetpotatopie.json_schema import UNCHECKED
+        item = {'type': 'string', UNCHECKED: ['check']}
+        document = {
+            UNCHECKED: ['root'],
+            'properties': {
+                'a/b': {'items': [{}, dict(item)]},
+                'c': {'anyOf': [{'type': 'array', 'items': item}, item]},
+            },
+        }
+        self.assertEqual(self._callFUT(document), [
+            ('/', ['root']),
+            ('/properties/a~1b/items/1', ['check']),
+            ('/properties/c/anyOf/0/items', ['check']),
+        ])
+
+
+def _decimal(value):
+    import decimal
+    return decimal.Decimal(value)
+
+
+def _date():
+    import datetime
+    return datetime.date(2020, 1, 1)
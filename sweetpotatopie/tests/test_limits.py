@@ -0,0 +1,171 @@
+import unittest
+
+
+class ErrorLimiterTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.limits import ErrorLimiter
+        return ErrorLimiter
+
+    def _makeOne(self, schema, max_errors=1):
+        return self._getTargetClass()(schema, max_errors)
+
+    def _makeSchema(self):
+        from sweetpotatopie.parsers import SchemaParser
+        TEXT = '\n'.join([
+            "!schema",
+            "  children:",
+            "    - !field.sequence",
+            "      name: items",
+            "      children:",
+            "        - !field.mapping",
+            "          name: item",
+            "          children:",
+            "            - !field.integer",
+            "              name: a",
+            "            - !field.integer",
+            "              name: b",
+            "    - !field.tuple",
+            "      name: pair",
+            "      children:",
+            "        - !field.integer",
+            "          name: first",
+            "        - !field.integer",
+            "          name: second",
+            "    - !field.string",
+            "      name: tail",
+        ])
+        return SchemaParser()(TEXT)
+
+    def _makeData(self, bad=5, good=3):
+        return {
+            'items': ([{'a': 'x', 'b': 'y'} for i in range(bad)] +
+                      [{'a': '1', 'b': '2'} for i in range(good)]),
+            'pair': ['1', '2'],
+            'tail': 'z',
+        }
+
+    def test_ctor_w_invalid_max_errors(self):
+        self.assertRaises(ValueError, self._makeOne, self._makeSchema(), 0)
+
+    def test_does_not_modify_original_schema(self):
+        schema = self._makeSchema()
+        self._makeOne(schema)
+        self.failIf('deserialize' in schema.__dict__)
+        self.failIf('deserialize' in schema.children[0].__dict__)
+
+    def test_deserialize_valid(self):
+        limiter = self._makeOne(self._makeSchema())
+        result = limiter.deserialize(self._makeData(bad=0))
+        self.assertEqual(result['items'], [{'a': 1, 'b': 2}] * 3)
+        self.assertEqual(result['pair'], (1, 2))
+        self.assertEqual(result['tail'], 'z')
+
+    def test_deserialize_fail_fast(self):
+        import colander
+        limiter = self._makeOne(self._makeSchema())
+        try:
+            limiter.deserialize(self._makeData())
+        except colander.Invalid as e:
+            self.assertEqual(e.asdict(),
+                             {'items.0.a': '"x" is not a number'})
+            self.failUnless(e.truncated)
+            self.assertEqual(e.error_count, 1)
+            # items.0.b, items.1 - items.7, pair, tail
+            self.assertEqual(e.unchecked, 10)
+        else:
+            self.fail('Invalid not raised')
+
+    def test_deserialize_capped(self):
+        import colander
+        limiter = self._makeOne(self._makeSchema(), 3)
+        try:
+            limiter.deserialize(self._makeData())
+        except colander.Invalid as e:
+            self.assertEqual(sorted(e.asdict()),
+                             ['items.0.a', 'items.0.b', 'items.1.a'])
+            self.failUnless(e.truncated)
+            self.assertEqual(e.error_count, 3)
+            self.assertEqual(e.unchecked, 9)
+        else:
+            self.fail('Invalid not raised')
+
+    def test_deserialize_under_cap_matches_schema(self):
+        import colander
+        schema = self._makeSchema()
+        data = self._makeData(bad=2)
+        data['pair'] = ['x', '2']
+        limiter = self._makeOne(schema, 100)
+        try:
+            schema.deserialize(data)
+        except colander.Invalid as e:
+            expected = e.asdict()
+        try:
+            limiter.deserialize(data)
+        except colander.Invalid as e:
+            self.assertEqual(e.asdict(), expected)
+            self.failIf(e.truncated)
+            self.assertEqual(e.error_count, len(expected))
+            self.assertEqual(e.unchecked, 0)
+        else:
+            self.fail('Invalid not raised')
+
+    def test_deserialize_exactly_at_cap(self):
+        import colander
+        schema = self._makeSchema()
+        data = self._makeData(bad=2, good=0)
+        data['pair'] = ['x', 'y']
+        del data['tail']
+        try:
+            schema.deserialize(data)
+        except colander.Invalid as e:
+            expected = e.asdict()
+        self.assertEqual(len(expected), 7)
+        limiter = self._makeOne(schema, 7)
+        try:
+            limiter.deserialize(data)
+        except colander.Invalid as e:
+            self.assertEqual(e.asdict(), expected)
+            self.failIf(e.truncated)
+            self.assertEqual(e.error_count, 7)
+            self.assertEqual(e.unchecked, 0)
+        else:
+            self.fail('Invalid not raised')
+
+    def test_instrumented_clone_usable_directly(self):
+        import colander
+        limiter = self._makeOne(self._makeSchema())
+        data = self._makeData(bad=2)
+        try:
+            limiter._schema.deserialize(data)
+        except colander.Invalid as e:
+            self.assertEqual(len(e.asdict()), 4)
+            self.failIf(hasattr(e, 'truncated'))
+        else:
+            self.fail('Invalid not raised')
+
+    def test_deserialize_tuple_position(self):
+        import colander
+        limiter = self._makeOne(self._makeSchema())
+        data = self._makeData(bad=0)
+        data['pair'] = ['1', 'x']
+        try:
+            limiter.deserialize(data)
+        except colander.Invalid as e:
+            self.assertEqual(e.asdict(),
+                             {'pair.1': '"x" is not a number'})
+            self.assertEqual(e.unchecked, 1)
+        else:
+            self.fail('Invalid not raised')
+
+    def test_deserialize_root_error(self):
+        import colander
+        limiter = self._makeOne(self._makeSchema())
+        try:
+            limiter.deserialize('not a mapping')
+        except colander.Invalid as e:
+            self.failUnless(e.node is limiter._schema)
+            self.failIf(e.truncated)
+            self.assertEqual(e.unchecked, 0)
+        else:
+            self.fail('Invalid not raised')
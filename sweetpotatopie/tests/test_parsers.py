@@ -42,8 +42,8 @@ class SchemaParserTests(unittest.TestCase):
         from sweetpotatopie.parsers import SchemaParser
         return SchemaParser
 
-    def _makeOne(self):
-        return self._getTargetClass()()
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
 
     def test_class_conforms_to_IParser(self):
         from zope.interface.verify import verifyClass
@@ -147,6 +147,104 @@ class SchemaParserTests(unittest.TestCase):
         self.failUnless(isinstance(validator, colander.OneOf))
         choices = validator.choices
         self.assertEqual(list(choices), ['red', 'blue', 'green'])
+        self.failUnless('blue' in choices)
+        self.failIf('purple' in choices)
+
+    def test_string_field_with_choices_file(self):
+        import os
+        import shutil
+        import tempfile
+        import colander
+        from sweetpotatopie.choices import _loaded
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'colors.txt')
+            with open(path, 'w') as f:
+                f.write('red\nblue\ngreen\n')
+            TEXT = '\n'.join([
+                "!schema",
+                " children:",
+                "  - !field.string",
+                "    name : favorite_color",
+                "    validator : !validator.one_of",
+                "      choices_file : %s" % path,
+                "  - !field.string",
+                "    name : least_favorite_color",
+                "    validator : !validator.one_of",
+                "      choices_file : %s" % path,
+            ])
+            parser = self._makeOne()
+            schema = parser(TEXT)
+        finally:
+            shutil.rmtree(tmpdir)
+            _loaded.clear()
+        first, second = [x.validator for x in schema.children]
+        self.failUnless(isinstance(first, colander.OneOf))
+        self.assertEqual(list(first.choices), ['red', 'blue', 'green'])
+        self.failUnless(first.choices is second.choices)
+
+    def test_relative_choices_file_resolved_against_schema_file(self):
+        import os
+        import shutil
+        import tempfile
+        from sweetpotatopie.choices import _loaded
+        tmpdir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmpdir, 'colors.txt'), 'w') as f:
+                f.write('red\nblue\n')
+            path = os.path.join(tmpdir, 'schema.yaml')
+            with open(path, 'w') as f:
+                f.write('\n'.join([
+                    "!field.string",
+                    "  name : favorite_color",
+                    "  validator : !validator.one_of",
+                    "    choices_file : colors.txt",
+                ]))
+            for streaming in (False, True):
+                parser = self._makeOne(streaming=streaming)
+                with open(path) as f:
+                    schema = parser(f)
+                self.assertEqual(list(schema.validator.choices),
+                                 ['red', 'blue'])
+        finally:
+            shutil.rmtree(tmpdir)
+            _loaded.clear()
+
+    def test_relative_choices_file_in_string(self):
+        from sweetpotatopie.positions import SchemaConstructionError
+        TEXT = '\n'.join([
+            "!field.string",
+            "  name : favorite_color",
+            "  validator : !validator.one_of",
+            "    choices_file : colors.txt",
+        ])
+        for streaming in (False, True):
+            parser = self._makeOne(streaming=streaming)
+            try:
+                parser(TEXT)
+            except SchemaConstructionError as e:
+                self.failUnless("relative choices_file 'colors.txt'"
+                                in str(e))
+            else:
+                self.fail('SchemaConstructionError not raised')
+
+    def test_one_of_with_choices_and_choices_file(self):
+        from sweetpotatopie.positions import SchemaConstructionError
+        TEXT = '\n'.join([
+            "!field.string",
+            "  name : favorite_color",
+            "  validator : !validator.one_of",
+            "    choices : [red, blue]",
+            "    choices_file : colors.txt",
+        ])
+        parser = self._makeOne()
+        try:
+            parser(TEXT)
+        except SchemaConstructionError as e:
+            self.failUnless("only one of 'choices' or 'choices_file'"
+                            in str(e))
+        else:
+            self.fail('SchemaConstructionError not raised')
 
     def test_string_field_with_both_regex_and_length_validators(self):
         import colander
@@ -462,3 +560,158 @@ class SchemaParserTests(unittest.TestCase):
         for i, name in enumerate(('min', 'max', 'mean', 'median', 'stddev')):
             self.assertEqual(elements[i].name, name)
             self.assertEqual(elements[i].typ.__class__, colander.Float)
+
+    def test_streaming(self):
+        import colander
+        TEXT = '\n'.join([
+            "!schema",
+            "  name: schema",
+            "  children:",
+            "   - &name !field.string",
+            "     name : first_name",
+            "     validator : !validator.length",
+            "       min: 1",
+            "   - !field.sequence",
+            "     name : nicknames",
+            "     children :",
+            "       - *name",
+        ])
+        parser = self._makeOne(streaming=True)
+        schema = parser(TEXT)
+        self.failUnless(isinstance(schema.typ, colander.Mapping))
+        self.assertEqual(len(schema.children), 2)
+        first_name, nicknames = schema.children
+        self.assertEqual(first_name.name, 'first_name')
+        self.failUnless(isinstance(first_name.typ, colander.String))
+        self.failUnless(isinstance(first_name.validator, colander.Length))
+        self.failUnless(isinstance(nicknames.typ, colander.Sequence))
+        self.failUnless(nicknames.children[0] is first_name)
+
+    def test_w_safe_loader_and_resolver(self):
+        import colander
+        from yaml import SafeLoader
+        from sweetpotatopie.resolver import NameResolver
+        global dummy_validator
+        def dummy_validator(node, value):
+            """ """
+        TEXT = '\n'.join([
+            "!schema",
+            " children:",
+            "  - !field.float",
+            "    name : temperature",
+            "    validator : !validator.function",
+            "      function: !!python/name:"
+                    "sweetpotatopie.tests.test_parsers.dummy_validator",
+        ])
+        resolver = NameResolver(['sweetpotatopie.tests'])
+        for streaming in (False, True):
+            parser = self._makeOne(streaming=streaming,
+                                   loader_class=SafeLoader,
+                                   resolver=resolver)
+            schema = parser(TEXT)
+            validator = schema.children[0].validator
+            self.failUnless(isinstance(validator, colander.Function))
+            self.failUnless(validator.function is dummy_validator)
+
+    def test_w_resolver_name_not_allowed(self):
+        from yaml import SafeLoader
+        from yaml.constructor import ConstructorError
+        from sweetpotatopie.resolver import NameResolver
+        TEXT = '\n'.join([
+            "!field.float",
+            "  name : temperature",
+            "  validator : !validator.function",
+            "    function: !!python/name:os.system",
+        ])
+        parser = self._makeOne(loader_class=SafeLoader,
+                               resolver=NameResolver(['colander']))
+        self.assertRaises(ConstructorError, parser, TEXT)
+
+    def test_constructor_failure_located(self):
+        from sweetpotatopie.positions import SchemaConstructionError
+        TEXT = '\n'.join([
+            "!schema",
+            "  name: person",
+            "  children:",
+            "   - !field.string",
+            "     name : first_name",
+            "   - !field.string",
+            "     name : phone",
+            "     type_args :",
+            "       bogus: 1",
+        ])
+        for streaming in (False, True):
+            parser = self._makeOne(streaming=streaming)
+            try:
+                parser(TEXT)
+            except SchemaConstructionError as e:
+                self.assertEqual(e.tag_path, ['!schema (person)',
+                                              '!field.string (phone)'])
+                self.failUnless(isinstance(e.original, TypeError))
+                self.assertEqual(e.problem_mark.line, 5)
+                self.assertEqual(e.problem_mark.column, 5)
+            else:
+                self.fail('SchemaConstructionError not raised')
+
+    def test_missing_choices_located(self):
+        from sweetpotatopie.positions import SchemaConstructionError
+        TEXT = '\n'.join([
+            "!field.string",
+            "  name : favorite_color",
+            "  validator : !validator.one_of",
+            "    msg_err: Bad color",
+        ])
+        try:
+            self._makeOne()(TEXT)
+        except SchemaConstructionError as e:
+            self.assertEqual(e.tag_path, ['!field.string (favorite_color)',
+                                          '!validator.one_of'])
+            self.failUnless(isinstance(e.original, KeyError))
+            self.assertEqual(e.problem_mark.line, 2)
+        else:
+            self.fail('SchemaConstructionError not raised')
+
+    def test_w_source_map(self):
+        from sweetpotatopie.positions import SourceMap
+        TEXT = '\n'.join([
+            "!schema",
+            "  children:",
+            "   - !field.string",
+            "     name : first_name",
+            "     validator : !validator.length",
+            "       min: 1",
+            "   - !field.date",
+            "     name : birth_date",
+        ])
+        for streaming in (False, True):
+            source_map = SourceMap()
+            schema = self._makeOne(streaming=streaming)(TEXT, source_map)
+            self.assertEqual(len(source_map), 3)
+            first_name, birth_date = schema.children
+            span = source_map.span(first_name)
+            self.assertEqual((span.line, span.column), (3, 6))
+            self.assertEqual((span.end_line, span.end_column), (7, 4))
+            span = source_map.span(birth_date)
+            self.assertEqual((span.line, span.column), (7, 6))
+            self.failIf(first_name.validator in source_map)
+
+    def test_w_intern(self):
+        TEXT = '\n'.join([
+            "!schema",
+            "  children:",
+            "   - !field.string",
+            "     name : first_name",
+            "     title : Name",
+            "   - !field.string",
+            "     name : last_name",
+            "     title : Name",
+        ])
+        for streaming in (False, True):
+            parser = self._makeOne(streaming=streaming, intern=True)
+            first, last = parser(TEXT).children
+            self.failUnless(first.title is last.title)
+            self.failIf(first.typ is last.typ)
+            other = parser(TEXT)
+            self.failUnless(other.children[0].title is first.title)
+            other.typ.unknown = 'raise'
+            self.failIf(first.typ is other.children[0].typ)
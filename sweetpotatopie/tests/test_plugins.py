@@ -0,0 +1,158 @@
+import unittest
+
+import colander
+
+
+class _RegistryCleanup(object):
+
+    def setUp(self):
+        from sweetpotatopie import plugins
+        self._saved = (plugins._registry.copy(),
+                       plugins._entry_points_loaded,
+                       plugins._iter_entry_points)
+        plugins._registry.clear()
+        plugins._entry_points_loaded = False
+        plugins._iter_entry_points = lambda group: []
+
+    def tearDown(self):
+        from sweetpotatopie import plugins
+        registry, loaded, iter_entry_points = self._saved
+        plugins._registry.clear()
+        plugins._registry.update(registry)
+        plugins._entry_points_loaded = loaded
+        plugins._iter_entry_points = iter_entry_points
+
+
+class Test_register(_RegistryCleanup, unittest.TestCase):
+
+    def _callFUT(self, tag, target):
+        from sweetpotatopie.plugins import register
+        return register(tag, target)
+
+    def test_w_invalid_kind(self):
+        self.assertRaises(ValueError, self._callFUT, '!bogus.foo', object)
+
+    def test_w_missing_name(self):
+        self.assertRaises(ValueError, self._callFUT, '!field', object)
+
+    def test_normalizes_tag(self):
+        from sweetpotatopie.plugins import _registry
+        self._callFUT('field.upper', DummyType)
+        self.failUnless('!field.upper' in _registry)
+
+    def test_target_not_resolved_until_used(self):
+        from sweetpotatopie.plugins import _registry
+        self._callFUT('!field.upper',
+                      'sweetpotatopie.tests.test_plugins:DummyType')
+        builder = _registry['!field.upper']
+        self.failUnless(builder._build is None)
+        node = builder({'name': 'shout'})
+        self.failUnless(isinstance(node.typ, DummyType))
+        self.failIf(builder._build is None)
+
+
+class Test_builders(_RegistryCleanup, unittest.TestCase):
+
+    def _callFUT(self):
+        from sweetpotatopie.plugins import builders
+        return builders()
+
+    def test_empty(self):
+        self.assertEqual(self._callFUT(), [])
+
+    def test_w_entry_points(self):
+        from sweetpotatopie import plugins
+        ep = DummyEntryPoint('validator.never', DummyValidator)
+        bogus = DummyEntryPoint('bogus.foo', object)
+        plugins._iter_entry_points = lambda group: [ep, bogus]
+        import warnings
+        with warnings.catch_warnings(record=True) as logged:
+            warnings.simplefilter('always')
+            found = self._callFUT()
+        self.assertEqual(len(logged), 1)
+        self.assertEqual([x[0] for x in found], ['!validator.never'])
+        self.failIf(ep.loaded)
+        validator = found[0][1]({'msg': 'Nope'})
+        self.failUnless(ep.loaded)
+        self.failUnless(isinstance(validator, DummyValidator))
+        self.assertEqual(validator.msg, 'Nope')
+
+    def test_entry_points_enumerated_once(self):
+        from sweetpotatopie import plugins
+        calls = []
+        def _iter_entry_points(group):
+            calls.append(group)
+            return []
+        plugins._iter_entry_points = _iter_entry_points
+        self._callFUT()
+        self._callFUT()
+        self.assertEqual(calls, [plugins.ENTRY_POINT_GROUP])
+
+    def test_registered_wins_over_entry_point(self):
+        from sweetpotatopie import plugins
+        from sweetpotatopie.plugins import register
+        ep = DummyEntryPoint('widget.fancy', object)
+        plugins._iter_entry_points = lambda group: [ep]
+        register('!widget.fancy', DummyWidget)
+        found = dict(self._callFUT())
+        self.failUnless(isinstance(found['!widget.fancy']({}), DummyWidget))
+
+
+class SchemaParserPluginTests(_RegistryCleanup, unittest.TestCase):
+
+    def test_registered_tags_parsed(self):
+        from sweetpotatopie.parsers import SchemaParser
+        from sweetpotatopie.plugins import register
+        register('!field.upper', 'sweetpotatopie.tests.test_plugins:DummyType')
+        register('!validator.never', DummyValidator)
+        register('!widget.fancy', DummyWidget)
+        TEXT = '\n'.join([
+            "!schema",
+            " children:",
+            "  - !field.upper",
+            "    name : shout",
+            "    validator : !validator.never",
+            "      msg: Nope",
+            "    widget : !widget.fancy",
+            "      size: 3",
+        ])
+        for streaming in (False, True):
+            schema = SchemaParser(streaming=streaming)(TEXT)
+            shout = schema.children[0]
+            self.failUnless(isinstance(shout.typ, DummyType))
+            self.failUnless(isinstance(shout.validator, DummyValidator))
+            self.assertEqual(shout.validator.msg, 'Nope')
+            self.failUnless(isinstance(shout.widget, DummyWidget))
+            self.assertEqual(shout.widget.kw, {'size': 3})
+
+
+class DummyType(colander.String):
+    pass
+
+
+class DummyValidator(object):
+
+    def __init__(self, msg='Never'):
+        self.msg = msg
+
+    def __call__(self, node, value):
+        raise colander.Invalid(node, self.msg)
+
+
+class DummyWidget(object):
+
+    def __init__(self, **kw):
+        self.kw = kw
+
+
+class DummyEntryPoint(object):
+
+    loaded = False
+
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+
+    def load(self):
+        self.loaded = True
+        return self.target
@@ -0,0 +1,145 @@
+import unittest
+
+
+class Test_construction_error(unittest.TestCase):
+
+    def _callFUT(self, exc, tag, source, mark):
+        from sweetpotatopie.positions import construction_error
+        return construction_error(exc, tag, source, mark)
+
+    def _makeMark(self, line=3, column=4):
+        from yaml import Mark
+        return Mark('schema.yaml', 0, line, column, None, None)
+
+    def test_wraps_plain_exception(self):
+        from sweetpotatopie.positions import SchemaConstructionError
+        exc = TypeError('bad kwarg')
+        mark = self._makeMark()
+        error = self._callFUT(exc, '!field.string', {'name': 'phone'}, mark)
+        self.failUnless(isinstance(error, SchemaConstructionError))
+        self.failUnless(error.original is exc)
+        self.failUnless(error.problem_mark is mark)
+        self.assertEqual(error.tag_path, ['!field.string (phone)'])
+        self.assertEqual(error.context,
+                         'while constructing !field.string (phone)')
+        self.assertEqual(error.problem, 'TypeError: bad kwarg')
+        self.failUnless('line 4, column 5' in str(error))
+
+    def test_prepends_to_nested_error(self):
+        inner = self._callFUT(KeyError('choices'), '!validator.one_of', {},
+                              self._makeMark())
+        error = self._callFUT(inner, '!schema', None, self._makeMark(0, 0))
+        self.failUnless(error is inner)
+        self.assertEqual(error.tag_path, ['!schema', '!validator.one_of'])
+        self.assertEqual(error.context,
+                         'while constructing !schema > !validator.one_of')
+        self.assertEqual(error.problem_mark.line, 3)
+
+    def test_passes_yaml_errors(self):
+        from yaml.constructor import ConstructorError
+        exc = ConstructorError(None, None, 'oops', self._makeMark())
+        self.failUnless(self._callFUT(exc, '!schema', {}, None) is exc)
+
+    def test_name_from_node(self):
+        from yaml.nodes import MappingNode
+        from yaml.nodes import ScalarNode
+        node = MappingNode('!field.string', [
+            (ScalarNode('tag:yaml.org,2002:str', 'title'),
+             ScalarNode('tag:yaml.org,2002:str', 'Phone')),
+            (ScalarNode('tag:yaml.org,2002:str', 'name'),
+             ScalarNode('tag:yaml.org,2002:str', 'phone')),
+        ])
+        error = self._callFUT(ValueError(), '!field.string', node, None)
+        self.assertEqual(error.tag_path, ['!field.string (phone)'])
+
+
+class SourceMapTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.positions import SourceMap
+        return SourceMap
+
+    def _makeOne(self):
+        return self._getTargetClass()()
+
+    def _makeMark(self, line, column, name='schema.yaml'):
+        from yaml import Mark
+        return Mark(name, 0, line, column, None, None)
+
+    def test_empty(self):
+        source_map = self._makeOne()
+        self.assertEqual(len(source_map), 0)
+        self.failIf(Dummy() in source_map)
+        self.assertRaises(KeyError, source_map.span, Dummy())
+
+    def test_add_and_span(self):
+        source_map = self._makeOne()
+        first, second = Dummy(), Dummy()
+        source_map.add(first, self._makeMark(0, 0), self._makeMark(9, 0))
+        source_map.add(second, self._makeMark(2, 4), self._makeMark(5, 2))
+        self.assertEqual(len(source_map), 2)
+        self.failUnless(second in source_map)
+        span = source_map.span(second)
+        self.assertEqual(span.name, 'schema.yaml')
+        self.assertEqual((span.line, span.column), (3, 5))
+        self.assertEqual((span.end_line, span.end_column), (6, 3))
+        self.assertEqual(source_map.span(first).line, 1)
+
+    def test_nodes_held_weakly(self):
+        import gc
+        source_map = self._makeOne()
+        node = Dummy()
+        source_map.add(node, self._makeMark(0, 0), self._makeMark(1, 0))
+        del node
+        gc.collect()
+        self.assertEqual(len(source_map), 0)
+
+    def test_name_per_span(self):
+        source_map = self._makeOne()
+        first, second = Dummy(), Dummy()
+        source_map.add(first, self._makeMark(0, 0, 'good.yaml'),
+                       self._makeMark(1, 0, 'good.yaml'))
+        source_map.add(second, self._makeMark(0, 0, '<unicode string>'),
+                       self._makeMark(1, 0, '<unicode string>'))
+        self.assertEqual(source_map.span(first).name, 'good.yaml')
+        self.assertEqual(source_map.span(second).name, '<unicode string>')
+
+    def test_readd_updates_span(self):
+        source_map = self._makeOne()
+        node = Dummy()
+        source_map.add(node, self._makeMark(0, 0), self._makeMark(1, 0))
+        source_map.add(node, self._makeMark(4, 0), self._makeMark(5, 0))
+        self.assertEqual(len(source_map), 1)
+        self.assertEqual(source_map.span(node).line, 5)
+        self.assertEqual(len(source_map._spans), 5)
+
+    def test_slots_reused(self):
+        import gc
+        source_map = self._makeOne()
+        keep = Dummy()
+        source_map.add(keep, self._makeMark(7, 0), self._makeMark(8, 0))
+        for i in range(100):
+            node = Dummy()
+            source_map.add(node, self._makeMark(i, 0), self._makeMark(i, 1))
+            del node
+            gc.collect()
+        self.assertEqual(len(source_map), 1)
+        self.assertEqual(len(source_map._spans), 10)
+        self.assertEqual(source_map.span(keep).line, 8)
+
+    def test_map_not_kept_alive_by_nodes(self):
+        import gc
+        import weakref
+        source_map = self._makeOne()
+        node = Dummy()
+        source_map.add(node, self._makeMark(0, 0), self._makeMark(1, 0))
+        map_ref = weakref.ref(source_map)
+        del source_map
+        gc.collect()
+        self.failUnless(map_ref() is None)
+        del node
+        gc.collect()
+
+
+class Dummy(object):
+    pass
@@ -0,0 +1,148 @@
+import unittest
+
+
+class SchemaProfilerTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.profiling import SchemaProfiler
+        return SchemaProfiler
+
+    def _makeOne(self, schema, timer=None):
+        if timer is None:
+            timer = DummyTimer()
+        return self._getTargetClass()(schema, timer)
+
+    def _makeSchema(self):
+        from sweetpotatopie.parsers import SchemaParser
+        TEXT = '\n'.join([
+            "!schema",
+            "  name: person",
+            "  children:",
+            "    - !field.string",
+            "      name: phone",
+            "      validator: !validator.all",
+            "        validators:",
+            "          - !validator.regex",
+            "            regex: '\\d+'",
+            "          - !validator.length",
+            "            max: 10",
+            "    - !field.sequence",
+            "      name: tags",
+            "      children:",
+            "        - !field.string {}",
+        ])
+        return SchemaParser()(TEXT)
+
+    def test_does_not_modify_original_schema(self):
+        import colander
+        schema = self._makeSchema()
+        self._makeOne(schema)
+        self.failIf('deserialize' in schema.__dict__)
+        self.failIf('serialize' in schema.children[0].__dict__)
+        self.failUnless(isinstance(schema.children[0].validator, colander.All))
+
+    def test_deserialize_returns_result(self):
+        profiler = self._makeOne(self._makeSchema())
+        result = profiler.deserialize({'phone': '123', 'tags': ['a', 'b']})
+        self.assertEqual(result, {'phone': '123', 'tags': ['a', 'b']})
+
+    def test_deserialize_records_paths(self):
+        profiler = self._makeOne(self._makeSchema())
+        profiler.deserialize({'phone': '123', 'tags': ['a', 'b']})
+        entries = dict([(x.path, x) for x in profiler.report()])
+        self.assertEqual(sorted(entries), [
+            'deserialize/person',
+            'deserialize/person/phone',
+            'deserialize/person/phone/!validator:All',
+            'deserialize/person/phone/!validator:All/!validator:Length',
+            'deserialize/person/phone/!validator:All/!validator:Regex',
+            'deserialize/person/tags',
+            'deserialize/person/tags/<String>',
+        ])
+        self.assertEqual(entries['deserialize/person/tags/<String>'].calls, 2)
+        self.assertEqual(entries['deserialize/person'].calls, 1)
+
+    def test_clone_used_directly(self):
+        profiler = self._makeOne(self._makeSchema())
+        profiler.schema.deserialize({'phone': '123', 'tags': ['a']})
+        profiler.schema.children[0].deserialize('456')
+        profiler.schema.children[0].validator(None, '789')
+        entries = dict([(x.path, x) for x in profiler.report()])
+        self.assertEqual(entries['deserialize/person'].calls, 1)
+        self.assertEqual(entries['deserialize/person/phone'].calls, 1)
+        self.assertEqual(entries['deserialize/phone'].calls, 1)
+        self.assertEqual(entries['deserialize/phone/!validator:All'].calls, 1)
+        self.failIf(getattr(profiler._local, 'stack', None))
+
+    def test_deserialize_times(self):
+        # Each call to the timer advances the clock by one second.
+        profiler = self._makeOne(self._makeSchema())
+        profiler.deserialize({'phone': '123', 'tags': []})
+        entries = dict([(x.path, x) for x in profiler.report()])
+        regex = entries[
+            'deserialize/person/phone/!validator:All/!validator:Regex']
+        self.assertEqual(regex.total, 1.0)
+        self.assertEqual(regex.self, 1.0)
+        all_ = entries['deserialize/person/phone/!validator:All']
+        self.assertEqual(all_.total, 5.0)
+        self.assertEqual(all_.self, 3.0)
+        root = entries['deserialize/person']
+        self.assertEqual(root.self,
+                         root.total - entries['deserialize/person/phone'].total
+                         - entries['deserialize/person/tags'].total)
+
+    def test_deserialize_invalid_still_recorded(self):
+        import colander
+        profiler = self._makeOne(self._makeSchema())
+        self.assertRaises(colander.Invalid, profiler.deserialize,
+                          {'phone': 'abc', 'tags': []})
+        paths = [x.path for x in profiler.report()]
+        self.failUnless(
+            'deserialize/person/phone/!validator:All/!validator:Regex' in paths)
+
+    def test_serialize(self):
+        profiler = self._makeOne(self._makeSchema())
+        result = profiler.serialize({'phone': '123', 'tags': ['a']})
+        self.assertEqual(result, {'phone': '123', 'tags': ['a']})
+        paths = [x.path for x in profiler.report()]
+        self.failUnless('serialize/person/tags/<String>' in paths)
+
+    def test_report_sort(self):
+        profiler = self._makeOne(self._makeSchema())
+        profiler.deserialize({'phone': '123', 'tags': ['a', 'b', 'c']})
+        calls = [x.calls for x in profiler.report('calls')]
+        self.assertEqual(calls, sorted(calls, reverse=True))
+        self.assertEqual(profiler.report('total')[0].path,
+                         'deserialize/person')
+
+    def test_format_report(self):
+        profiler = self._makeOne(self._makeSchema())
+        profiler.deserialize({'phone': '123', 'tags': []})
+        lines = profiler.format_report(limit=2).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.failUnless(lines[0].split()[0] == 'calls')
+        self.failUnless(lines[1].endswith('deserialize/person'))
+
+    def test_collapsed_stacks(self):
+        profiler = self._makeOne(self._makeSchema())
+        profiler.deserialize({'phone': '123', 'tags': []})
+        lines = profiler.collapsed_stacks().splitlines()
+        self.failUnless(
+            'deserialize;person;phone;!validator:All;!validator:Regex 1000000'
+            in lines)
+
+    def test_reset(self):
+        profiler = self._makeOne(self._makeSchema())
+        profiler.deserialize({'phone': '123', 'tags': []})
+        profiler.reset()
+        self.assertEqual(profiler.report(), [])
+
+
+class DummyTimer(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
@@ -0,0 +1,170 @@
+import unittest
+
+
+class Test_resolve_name(unittest.TestCase):
+
+    def tearDown(self):
+        from sweetpotatopie.resolver import _resolved
+        _resolved.clear()
+
+    def _callFUT(self, name):
+        from sweetpotatopie.resolver import resolve_name
+        return resolve_name(name)
+
+    def test_dotted_name(self):
+        import os.path
+        self.failUnless(self._callFUT('os.path.join') is os.path.join)
+
+    def test_builtin(self):
+        self.failUnless(self._callFUT('len') is len)
+
+    def test_cached(self):
+        from sweetpotatopie.resolver import _resolved
+        found = self._callFUT('os.path.join')
+        self.failUnless(_resolved['os.path.join'] is found)
+
+    def test_missing_module(self):
+        self.assertRaises(ImportError, self._callFUT, 'nonesuch.module.foo')
+
+    def test_missing_attribute(self):
+        self.assertRaises(ImportError, self._callFUT, 'os.path.nonesuch')
+
+
+class NameResolverTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.resolver import NameResolver
+        return NameResolver
+
+    def _makeOne(self, allowed=(__name__,)):
+        return self._getTargetClass()(allowed)
+
+    def _load(self, resolver, text):
+        from yaml import SafeLoader
+        return resolver.configure(SafeLoader(text)).get_single_data()
+
+    def test_is_allowed(self):
+        resolver = self._makeOne(('pkg.module', 'other.func'))
+        self.failUnless(resolver.is_allowed('pkg.module'))
+        self.failUnless(resolver.is_allowed('pkg.module.func'))
+        self.failUnless(resolver.is_allowed('pkg.module.sub.func'))
+        self.failUnless(resolver.is_allowed('other.func'))
+        self.failIf(resolver.is_allowed('pkg.module_other.func'))
+        self.failIf(resolver.is_allowed('other.func2'))
+        self.failIf(resolver.is_allowed('pkg'))
+
+    def test_is_allowed_None(self):
+        resolver = self._makeOne(None)
+        self.failUnless(resolver.is_allowed('os.system'))
+
+    def test_resolve_not_allowed(self):
+        from yaml.constructor import ConstructorError
+        resolver = self._makeOne()
+        self.assertRaises(ConstructorError, resolver.resolve, 'os.system')
+
+    def test_resolve_empty(self):
+        from yaml.constructor import ConstructorError
+        resolver = self._makeOne()
+        self.assertRaises(ConstructorError, resolver.resolve, '')
+
+    def test_resolve_missing(self):
+        from yaml.constructor import ConstructorError
+        resolver = self._makeOne()
+        self.assertRaises(ConstructorError, resolver.resolve,
+                          __name__ + '.nonesuch')
+
+    def test_configure_only_on_loader_instance(self):
+        from yaml import SafeLoader
+        from .._compat import StringIO
+        loader = self._makeOne().configure(SafeLoader(StringIO()))
+        name = 'tag:yaml.org,2002:python/name:'
+        self.failIf(name in SafeLoader.yaml_multi_constructors)
+        self.failUnless(name in loader.yaml_multi_constructors)
+
+    def test_python_name(self):
+        found = self._load(self._makeOne(),
+                           '!!python/name:%s.factory' % __name__)
+        self.failUnless(found is factory)
+
+    def test_python_name_not_allowed(self):
+        from yaml.constructor import ConstructorError
+        self.assertRaises(ConstructorError, self._load, self._makeOne(),
+                          '!!python/name:os.system')
+
+    def test_python_name_w_value(self):
+        from yaml.constructor import ConstructorError
+        self.assertRaises(ConstructorError, self._load, self._makeOne(),
+                          '!!python/name:%s.factory foo' % __name__)
+
+    def test_python_module(self):
+        import sys
+        found = self._load(self._makeOne(), '!!python/module:%s' % __name__)
+        self.failUnless(found is sys.modules[__name__])
+
+    def test_python_module_not_allowed(self):
+        from yaml.constructor import ConstructorError
+        self.assertRaises(ConstructorError, self._load, self._makeOne(),
+                          '!!python/module:os')
+
+    def test_python_object(self):
+        found = self._load(self._makeOne(), '\n'.join([
+            '!!python/object:%s.Dummy' % __name__,
+            '  foo: 1',
+        ]))
+        self.failUnless(isinstance(found, Dummy))
+        self.assertEqual(found.foo, 1)
+
+    def test_python_object_w_dunder_key(self):
+        from yaml.constructor import ConstructorError
+        self.assertRaises(ConstructorError, self._load, self._makeOne(),
+                          '\n'.join([
+                            '!!python/object:%s.Dummy' % __name__,
+                            '  __class__: 1',
+                          ]))
+
+    def test_python_object_w_non_class(self):
+        from yaml.constructor import ConstructorError
+        self.assertRaises(ConstructorError, self._load, self._makeOne(),
+                          '!!python/object:%s.factory {}' % __name__)
+
+    def test_python_object_apply_mapping(self):
+        found = self._load(self._makeOne(), '\n'.join([
+            '!!python/object/apply:%s.factory' % __name__,
+            '  args: [1]',
+            '  kwds: {bar: 2}',
+        ]))
+        self.assertEqual(found, {'foo': 1, 'bar': 2})
+
+    def test_python_object_apply_sequence(self):
+        found = self._load(self._makeOne(),
+                           '!!python/object/apply:%s.factory [1]' % __name__)
+        self.assertEqual(found, {'foo': 1, 'bar': None})
+
+    def test_python_object_apply_w_state_and_items(self):
+        found = self._load(self._makeOne(), '\n'.join([
+            '!!python/object/apply:%s.DummyList' % __name__,
+            '  state: {foo: 1}',
+            '  listitems: [1, 2]',
+        ]))
+        self.assertEqual(found, [1, 2])
+        self.assertEqual(found.foo, 1)
+
+    def test_python_object_new(self):
+        found = self._load(self._makeOne(), '\n'.join([
+            '!!python/object/new:%s.Dummy' % __name__,
+            '  state: {foo: 1}',
+        ]))
+        self.failUnless(isinstance(found, Dummy))
+        self.assertEqual(found.foo, 1)
+
+
+class Dummy(object):
+    pass
+
+
+class DummyList(list):
+    pass
+
+
+def factory(foo, bar=None):
+    return {'foo': foo, 'bar': bar}
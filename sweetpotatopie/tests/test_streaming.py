@@ -0,0 +1,95 @@
+import unittest
+
+
+class EventBuilderTests(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from sweetpotatopie.streaming import EventBuilder
+        return EventBuilder
+
+    def _makeOne(self, text):
+        from yaml import Loader
+        from sweetpotatopie.parsers import configure_loader
+        return self._getTargetClass()(configure_loader(Loader(text)))
+
+    def _expected(self, text):
+        from yaml import Loader
+        from sweetpotatopie.parsers import configure_loader
+        return configure_loader(Loader(text)).get_single_data()
+
+    def _assertSame(self, text):
+        built = self._makeOne(text).get_single_data()
+        self.assertEqual(built, self._expected(text))
+        return built
+
+    def test_empty_stream(self):
+        self.assertEqual(self._assertSame(''), None)
+
+    def test_scalars(self):
+        built = self._assertSame('[1, 2.5, true, ~, foo, "3", 2013-04-12]')
+        self.assertEqual(built[0], 1)
+        self.assertEqual(built[4], 'foo')
+
+    def test_nested_collections(self):
+        self._assertSame('a: {b: [1, 2, {c: d}]}\ne: []\n')
+
+    def test_anchors_and_aliases(self):
+        built = self._assertSame('a: &x [1, 2]\nb: *x\n')
+        self.failUnless(built['a'] is built['b'])
+
+    def test_recursive_alias(self):
+        built = self._makeOne('a: &x [1, *x]').get_single_data()
+        self.failUnless(built['a'][1] is built['a'])
+
+    def test_merge_keys(self):
+        self._assertSame('{<<: [{a: 1}, {a: 2, b: 3}], b: 4}')
+        self._assertSame('base: &b {a: 1, b: 2}\nderived: {<<: *b, b: 3}\n')
+
+    def test_merge_key_w_scalar(self):
+        from yaml.constructor import ConstructorError
+        builder = self._makeOne('{<<: 1}')
+        self.assertRaises(ConstructorError, builder.get_single_data)
+
+    def test_unhashable_key(self):
+        from yaml.constructor import ConstructorError
+        builder = self._makeOne('? [1, 2]\n: foo\n')
+        self.assertRaises(ConstructorError, builder.get_single_data)
+
+    def test_other_tags_delegated_to_loader(self):
+        built = self._assertSame(
+                    '[!!set {a, b}, !!python/tuple [1, &z 2], *z]')
+        self.assertEqual(built[1], (1, 2))
+        self.assertEqual(built[2], 2)
+
+    def test_alias_into_delegated_subtree(self):
+        built = self._assertSame('a: &x [1]\nb: !!python/tuple [*x]\n')
+        self.failUnless(built['b'][0] is built['a'])
+
+    def test_undefined_alias(self):
+        from yaml.composer import ComposerError
+        builder = self._makeOne('a: *x')
+        self.assertRaises(ComposerError, builder.get_single_data)
+
+    def test_duplicate_anchor(self):
+        from yaml.composer import ComposerError
+        builder = self._makeOne('a: &x 1\nb: &x 2\n')
+        self.assertRaises(ComposerError, builder.get_single_data)
+
+    def test_multiple_documents(self):
+        from yaml.composer import ComposerError
+        builder = self._makeOne('a\n---\nb\n')
+        self.assertRaises(ComposerError, builder.get_single_data)
+
+    def test_tagged_mapping_uses_build(self):
+        import colander
+        TEXT = '\n'.join([
+            "!field.string",
+            "  name : phone",
+            "  validator : !validator.length",
+            "    min: 3",
+        ])
+        schema = self._makeOne(TEXT).get_single_data()
+        self.failUnless(isinstance(schema.typ, colander.String))
+        self.assertEqual(schema.name, 'phone')
+        self.failUnless(isinstance(schema.validator, colander.Length))
+        self.assertEqual(schema.validator.min, 3)